@@ -1,17 +1,125 @@
-count = 0
-pos = 50
-TICK = 100 
-with open("input.txt","r") as file:
-    for line in file:
-        line = line.strip()
-        if not line:
-            continue
-        direction = line[0]
-        steps = int(line[1:])
-        delta = 1 if direction == "R" else -1
-
-        for _ in range(steps):
-            pos = (pos + delta) % TICK
-            if pos == 0:
-                count += 1
-print(count)
\ No newline at end of file
+import os
+import sys
+
+import numpy as np
+
+TICK = 100
+CHUNK_BYTES = 1 << 24
+
+
+def rotate(pos, direction, steps):
+    """Return (new_pos, zero_hits) for one rotation without stepping click by click.
+
+    Turning left from pos is the same as turning right from the mirrored
+    position (TICK - pos) % TICK, so both directions reduce to counting how
+    many multiples of TICK lie in (start, start + steps].
+    """
+    if direction == "R":
+        return (pos + steps) % TICK, (pos + steps) // TICK
+    mirrored = (TICK - pos) % TICK
+    return (pos - steps) % TICK, (mirrored + steps) // TICK
+
+
+def solve(path, pos=50):
+    count = 0
+    with open(path,"r") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            direction = line[0]
+            steps = int(line[1:])
+
+            pos, hits = rotate(pos, direction, steps)
+            count += hits
+    return count
+
+
+MAX_DIGITS = 18                                  # largest step count int64 always holds
+POW10 = 10 ** np.arange(MAX_DIGITS, dtype=np.int64)
+
+
+def parse_chunk(buf):
+    """Parse a block of whole lines into (is_right, steps, wide) in one pass.
+
+    Every rotation starts at an 'L'/'R' byte, so those bytes anchor the
+    records; each digit is assigned to the last anchor before it and weighted
+    by how many digits of its record follow it.  Steps with more than
+    MAX_DIGITS digits would overflow int64, so they are left at 0 in steps
+    and returned exactly in wide, a dict of record index -> int.
+    """
+    anchors = np.flatnonzero((buf == ord("L")) | (buf == ord("R")))
+    digit_idx = np.flatnonzero((buf >= ord("0")) & (buf <= ord("9")))
+    rec = np.searchsorted(anchors, digit_idx, side="right") - 1
+    per_rec = np.bincount(rec, minlength=len(anchors))
+    exponent = np.cumsum(per_rec)[rec] - np.arange(1, len(digit_idx) + 1)
+    narrow = per_rec[rec] <= MAX_DIGITS
+    vals = (buf[digit_idx[narrow]] - ord("0")).astype(np.int64) * POW10[exponent[narrow]]
+    steps = np.zeros(len(anchors), dtype=np.int64)
+    np.add.at(steps, rec[narrow], vals)
+    wide = {int(k): int(bytes(buf[digit_idx[rec == k]]))
+            for k in np.flatnonzero(per_rec > MAX_DIGITS)}
+    return buf[anchors] == ord("R"), steps, wide
+
+
+def rotate_batch(pos, is_right, steps):
+    """Vectorised rotate(): returns (final_pos, zero_hits) for a run of rotations."""
+    signed = np.where(is_right, steps % TICK, -(steps % TICK))
+    ends = (pos + np.cumsum(signed)) % TICK
+    starts = np.empty_like(ends)
+    starts[0] = pos
+    starts[1:] = ends[:-1]
+    from_zero = np.where(is_right, starts, (TICK - starts) % TICK)
+    hits = (from_zero + steps) // TICK
+    # near-MAX_DIGITS steps give hits whose int64 sum could overflow
+    if int(hits.max()) > np.iinfo(np.int64).max // len(hits):
+        return int(ends[-1]), sum(hits.tolist())
+    return int(ends[-1]), int(hits.sum())
+
+
+def solve_batch(path, pos=50, chunk_bytes=CHUNK_BYTES):
+    """Same answer as solve(), but memory-maps the log and works chunk by chunk.
+
+    Chunks are cut at the last newline so no rotation is split, which keeps
+    memory bounded by chunk_bytes however long the log is.
+    """
+    count = 0
+    if os.path.getsize(path) == 0:
+        return count
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    start, size = 0, len(data)
+    while start < size:
+        end = min(start + chunk_bytes, size)
+        if end < size:
+            nl = np.flatnonzero(data[start:end] == ord("\n"))
+            if len(nl):
+                end = start + int(nl[-1]) + 1
+            else:
+                # a single line longer than the chunk: run on to its newline
+                while end < size:
+                    nl = np.flatnonzero(data[end:end + chunk_bytes] == ord("\n"))
+                    if len(nl):
+                        end += int(nl[0]) + 1
+                        break
+                    end = min(end + chunk_bytes, size)
+        is_right, steps, wide = parse_chunk(np.asarray(data[start:end]))
+        # vectorised runs between the (rare) over-wide steps, which go
+        # through the exact rotate() one at a time
+        lo = 0
+        for k in sorted(wide) + [len(steps)]:
+            if k > lo:
+                pos, hits = rotate_batch(pos, is_right[lo:k], steps[lo:k])
+                count += hits
+            if k < len(steps):
+                pos, hits = rotate(pos, "R" if is_right[k] else "L", wide[k])
+                count += hits
+            lo = k + 1
+        start = end
+    return count
+
+
+if __name__ == "__main__":
+    if "--batch" in sys.argv[1:]:
+        print(solve_batch("input.txt"))
+    else:
+        print(solve("input.txt"))
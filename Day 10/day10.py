@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 from fractions import Fraction
-from itertools import product
-from math import prod
+from math import ceil, floor, gcd
 import sys
 from typing import List, Tuple
 
+import numpy as np
+
+TIGHTEN_PASSES = 3  # bound-propagation sweeps per branch-and-bound node
+BLAND_AFTER = 200   # simplex pivots before switching to the anti-cycling rule
+BATCH_BOX = 50_000  # enumerate branch-and-bound boxes this small in one NumPy batch
+BATCH_ROWS = 1 << 16  # free-variable combinations per matrix product
+
 # --- parsing ---
 def parse_line(line: str):
     """Return (diagram, buttons_list, targets_list) or None for empty lines."""
@@ -42,20 +48,23 @@ def parse_line(line: str):
 
     return diagram, btns, targets
 
-# --- Gaussian elimination (exact with Fractions) to REF and pivots ---
-def gaussian_elimination_ref(A: List[List[Fraction]], b: List[Fraction]) -> Tuple[List[List[Fraction]], List[int]]:
+# --- Fraction-free (Bareiss) Gauss-Jordan elimination ---
+def bareiss_rref(A: List[List[int]], b: List[int]) -> Tuple[List[List[int]], List[int]]:
     """
-    Convert augmented matrix [A|b] to row-echelon form (REF) using exact fractions.
-    Returns (augmented_matrix_in_ref, pivot_cols_per_row) where pivot_cols[r] is column index or -1.
+    Reduce the integer augmented matrix [A|b] to reduced row-echelon form without
+    leaving the integers. Each step is row_r = (p * row_r - a_r * row_piv) / p_prev,
+    and Bareiss' identity guarantees that division is exact. Every pivot row ends
+    up reading M[r][p] * x_p + sum_f M[r][f] * x_f = M[r][n] with M[r][p] > 0 and
+    the row divided by its gcd. Returns (augmented_matrix_in_rref, pivot_cols_per_row)
+    where pivot_cols[r] is column index or -1.
     """
     m = len(A)
     n = len(A[0]) if m>0 else 0
-    # build augmented matrix
     M = [list(row) + [b_i] for row, b_i in zip(A, b)]
     pivot_cols = [-1]*m
     row = 0
+    prev = 1
     for col in range(n):
-        # find pivot row
         sel = None
         for r in range(row, m):
             if M[r][col] != 0:
@@ -63,20 +72,30 @@ def gaussian_elimination_ref(A: List[List[Fraction]], b: List[Fraction]) -> Tupl
                 break
         if sel is None:
             continue
-        # swap
         M[row], M[sel] = M[sel], M[row]
         pivot_cols[row] = col
-        # normalize pivot row (optional for REF; we don't need to divide)
-        # eliminate below and optionally above to get reduced? We'll eliminate above too for easier back-sub.
+        piv_row = M[row]
+        p = piv_row[col]
         for r in range(m):
-            if r != row and M[r][col] != 0:
-                factor = M[r][col] / M[row][col]
-                # row_r = row_r - factor * row_row
-                for c in range(col, n+1):
-                    M[r][c] -= factor * M[row][c]
+            if r == row:
+                continue
+            a = M[r][col]
+            # rows untouched by this pivot still need rescaling to the new determinant
+            M[r] = [(p * v - a * w) // prev for v, w in zip(M[r], piv_row)]
+        prev = p
         row += 1
         if row == m:
             break
+
+    for r in range(m):
+        g = 0
+        for v in M[r]:
+            g = gcd(g, v)
+        if g > 1:
+            M[r] = [v // g for v in M[r]]
+        c = pivot_cols[r]
+        if c != -1 and M[r][c] < 0:
+            M[r] = [-v for v in M[r]]
     return M, pivot_cols
 
 # --- Utilities ---
@@ -121,33 +140,128 @@ def variable_upper_bounds(A: List[List[Fraction]], targets: List[int]) -> List[i
     bounds = [max(0, int(x)) for x in bounds]
     return bounds
 
-def solve_integer_min_sum(A_int: List[List[int]], b_int: List[int], max_free_product_cap=5_000_000) -> int:
+# --- exact LP relaxation (dense simplex over Fractions) ---
+def _pivot(T: List[List[Fraction]], zrow: List[Fraction], basis: List[int], r: int, c: int) -> None:
+    piv = T[r][c]
+    T[r] = [v / piv for v in T[r]]
+    for i in range(len(T)):
+        if i != r and T[i][c] != 0:
+            f = T[i][c]
+            T[i] = [a - f * b for a, b in zip(T[i], T[r])]
+    if zrow[c] != 0:
+        f = zrow[c]
+        zrow[:] = [a - f * b for a, b in zip(zrow, T[r])]
+    basis[r] = c
+
+def _run_simplex(T, zrow, basis, banned=()) -> None:
+    """Maximise; zrow holds -c_j (plus the value in the last slot)."""
+    steps = 0
+    while True:
+        # Dantzig's rule is much faster in practice; fall back to Bland's
+        # rule (which cannot cycle) if a run of pivots goes on too long
+        candidates = [j for j in range(len(zrow) - 1) if zrow[j] < 0 and j not in banned]
+        if not candidates:
+            return
+        steps += 1
+        enter = min(candidates, key=lambda j: zrow[j]) if steps <= BLAND_AFTER else candidates[0]
+        leave, best_ratio = None, None
+        for i in range(len(T)):
+            if T[i][enter] > 0:
+                ratio = T[i][-1] / T[i][enter]
+                if leave is None or ratio < best_ratio or (ratio == best_ratio and basis[i] < basis[leave]):
+                    leave, best_ratio = i, ratio
+        if leave is None:
+            return  # unbounded; cannot happen with every variable boxed
+        _pivot(T, zrow, basis, leave, enter)
+
+def lp_max(c: List[Fraction], G: List[List[Fraction]], h: List[Fraction]):
+    """
+    Maximise c.z subject to G z <= h, z >= 0 with exact arithmetic.
+    Returns (value, z) or None if infeasible. G must bound every variable.
+    """
+    m, n = len(G), len(c)
+    x0 = n + m
+    T = [list(G[i]) + [Fraction(int(i == k)) for k in range(m)] + [Fraction(-1), Fraction(h[i])] for i in range(m)]
+    basis = [n + i for i in range(m)]
+
+    # phase 1: bring the artificial x0 in at the most violated row, then minimise it
+    worst = min(range(m), key=lambda i: h[i]) if m else None
+    if worst is not None and h[worst] < 0:
+        zrow = [Fraction(0)] * (x0 + 2)
+        zrow[x0] = Fraction(1)
+        _pivot(T, zrow, basis, worst, x0)
+        _run_simplex(T, zrow, basis)
+        if zrow[-1] < 0:
+            return None
+        if x0 in basis:
+            r = basis.index(x0)
+            c_in = next((j for j in range(x0) if T[r][j] != 0), None)
+            if c_in is not None:
+                _pivot(T, [Fraction(0)] * (x0 + 2), basis, r, c_in)
+
+    # phase 2
+    zrow = [-Fraction(v) for v in c] + [Fraction(0)] * (m + 2)
+    for i, b in enumerate(basis):
+        if zrow[b] != 0:
+            f = zrow[b]
+            zrow = [a - f * v for a, v in zip(zrow, T[i])]
+    _run_simplex(T, zrow, basis, banned={x0})
+
+    z = [Fraction(0)] * n
+    for i, b in enumerate(basis):
+        if b < n:
+            z[b] = T[i][-1]
+    return zrow[-1], z
+
+def batch_min_sum(den, num, a, lo, hi, plo, phi, chunk=BATCH_ROWS):
+    """
+    Smallest x_free.sum() + x_piv.sum() over every integer point lo <= x_free <= hi,
+    where den * x_piv = num - a @ x_free must be exact with plo <= x_piv <= phi.
+    Combinations are evaluated chunk rows at a time as int64 matrix products.
+    Returns None if no point of the box qualifies.
+    """
+    lo = np.asarray(lo, dtype=np.int64)
+    shape = tuple(int(h - l + 1) for l, h in zip(lo, hi))
+    a = np.asarray(a, dtype=np.int64).reshape(len(num), len(lo))
+    num = np.asarray(num, dtype=np.int64)
+    den = np.asarray(den, dtype=np.int64)
+    plo = np.asarray(plo, dtype=np.int64)
+    phi = np.asarray(phi, dtype=np.int64)
+    best = None
+    count = int(np.prod(shape))
+    for start in range(0, count, chunk):
+        idx = np.arange(start, min(start + chunk, count))
+        X = np.stack(np.unravel_index(idx, shape), axis=1) + lo
+        Q, R = np.divmod(num - X @ a.T, den)
+        ok = ~R.any(axis=1) & (Q >= plo).all(axis=1) & (Q <= phi).all(axis=1)
+        if ok.any():
+            total = int((X[ok].sum(axis=1) + Q[ok].sum(axis=1)).min())
+            if best is None or total < best:
+                best = total
+    return best
+
+def solve_integer_min_sum(A_int: List[List[int]], b_int: List[int]) -> int:
     """
     Solve min sum x_k subject to A_int * x = b_int, x>=0 integer.
     Approach:
-      - Use Fraction gaussian elimination on A/b to find pivots and free variables
+      - Use fraction-free (Bareiss) elimination on A/b to find pivots and free variables
       - Compute upper bounds for each variable
-      - Enumerate all combinations of free variables within bounds (product of ranges)
-      - For each combo, back-substitute pivots and check integer & bounds, track minimum sum
-    Returns minimal sum (int) or raises RuntimeError if enumeration cap exceeded.
+      - Write every pivot variable as den_p * x_p = num_p - sum_f a_pf * x_f over the
+        free variables; candidates are checked with integer arithmetic only
+      - Boxes of at most BATCH_BOX combinations are enumerated in one vectorised batch
+      - Branch and bound over boxes of free-variable values (plus a range per pivot):
+        tighten each box from 0 <= x_p <= bounds[p] on every pivot row, bound it with
+        the exact LP relaxation, prune on best_sum and split on a fractional variable
+    Returns minimal sum (int) or 10**12 if there is no solution.
     """
-    # Convert to Fractions
-    A_frac = [[Fraction(v) for v in row] for row in A_int]
-    b_frac = [Fraction(v) for v in b_int]
-
-    # REF
-    M_ref, piv_cols = gaussian_elimination_ref(A_frac, b_frac)
+    # integer RREF
+    M_ref, piv_cols = bareiss_rref(A_int, b_int)
     m = len(M_ref)
-    n = len(A_frac[0]) if m>0 else 0
+    n = len(A_int[0]) if m>0 else 0
 
     # Consistency check: any all-zero row with nonzero RHS -> no solution
     for r in range(m):
-        all_zero = True
-        for c in range(n):
-            if M_ref[r][c] != 0:
-                all_zero = False
-                break
-        if all_zero and M_ref[r][n] != 0:
+        if piv_cols[r] == -1 and M_ref[r][n] != 0:
             return 10**12  # no solution
 
     # identify pivot cols set and free cols list
@@ -168,98 +282,155 @@ def solve_integer_min_sum(A_int: List[List[int]], b_int: List[int], max_free_pro
                     ub = possible
         bounds[k] = ub if ub is not None else 0
 
-    # If no free variables, just compute unique solution
-    if not free_cols:
-        # Solve pivot variables by back substitution
-        x = [0]*n
-        # Because we performed elimination eliminating all other rows, we can compute:
-        # For each pivot row r with pivot column c: M_ref[r][c] * x_c + sum_{cc>c} M_ref[r][cc]*x_cc = M_ref[r][n]
-        # free vars are none so x_cc = 0 for cc>c
-        for r in range(m-1, -1, -1):
-            c = piv_cols[r]
-            if c == -1:
-                continue
-            rhs = M_ref[r][n]
-            s = Fraction(0)
-            for cc in range(c+1, n):
-                s += M_ref[r][cc] * Fraction(x[cc])
-            val = (rhs - s) / M_ref[r][c]
-            if val.denominator != 1:
-                return 10**12
-            iv = int(val)
-            if iv < 0 or iv > bounds[c]:
-                return 10**12
-            x[c] = iv
-        return sum(x)
-
-    # determine product of free ranges
-    free_ranges = [range(bounds[c]+1) for c in free_cols]  # 0..bounds[c]
-    total_combinations = prod(len(rng) for rng in free_ranges)
-    if total_combinations > max_free_product_cap:
-        raise RuntimeError(f"Free-variable search too big: {total_combinations} combinations (cap {max_free_product_cap})")
+    # The elimination also cleared above each pivot, so pivot row r reads
+    #   den[r] * x_p = num[r] - sum_f a[r][f] * x_f   (f over free columns only)
+    pivots = [(r, c) for r, c in enumerate(piv_cols) if c != -1]
+    den = [M_ref[r][p] for r, p in pivots]
+    num = [M_ref[r][n] for r, _ in pivots]
+    a = [[M_ref[r][f] for f in free_cols] for r, _ in pivots]
+    piv_ub = [bounds[p] for _, p in pivots]
+    nf, npv = len(free_cols), len(pivots)
 
-    best_sum = None
+    # rational form x_p = rhs[r] - sum_f coef[r][f] * x_f for the LP and propagation
+    rhs = [Fraction(num[r], den[r]) for r in range(npv)]
+    coef = [[Fraction(a[r][f], den[r]) for f in range(nf)] for r in range(npv)]
 
-    # For stable back-substitution, build a mapping row->pivot column and ensure rows with pivot exist
-    # We'll use piv_cols list as returned (length m, with -1 for non-pivot rows)
-    for combo in product(*free_ranges):
-        x = [0]*n
-        # assign free vars
-        for idx, c in enumerate(free_cols):
-            x[c] = combo[idx]
-
-        # back-substitute pivot vars
-        valid = True
-        # iterate rows from bottom to top
-        for r in range(m-1, -1, -1):
-            c = piv_cols[r]
-            if c == -1:
-                # if row has no pivot, check equality 0 = rhs
-                # all coefficients should be zero in that row
-                # if RHS != 0 then inconsistent; skip
-                if M_ref[r][n] != 0:
-                    valid = False
-                    break
-                continue
-            # compute rhs - sum_{cc>c} M[r][cc]*x_cc
-            rhs = M_ref[r][n]
-            s = Fraction(0)
-            for cc in range(c+1, n):
-                s += M_ref[r][cc] * Fraction(x[cc])
-            # compute variable value
-            denom = M_ref[r][c]
-            if denom == 0:
-                # shouldn't happen
-                valid = False
-                break
-            val = (rhs - s) / denom
-            # must be integer and within bounds
-            if val.denominator != 1:
-                valid = False
-                break
-            iv = int(val)
-            if iv < 0 or iv > bounds[c]:
-                valid = False
+    # objective = sum(rhs) + sum_f weight[f] * x_f
+    weight = [1 - sum(coef[r][f] for r in range(npv)) for f in range(nf)]
+    base = sum(rhs)
+
+    def evaluate(xf):
+        """Objective for integer free values, or None if a pivot is fractional/out of range."""
+        total = sum(xf)
+        for r in range(npv):
+            v = num[r]
+            for f in range(nf):
+                v -= a[r][f] * xf[f]
+            q, rem = divmod(v, den[r])
+            if rem or q < 0 or q > piv_ub[r]:
+                return None
+            total += q
+        return total
+
+    def tighten(lo, hi, plo, phi):
+        """Shrink the box using plo <= x_p <= phi on every pivot row; False if empty."""
+        # propagation can creep towards its fixpoint one unit at a time, so cap the
+        # passes and leave the rest to the LP bound
+        for _ in range(TIGHTEN_PASSES):
+            changed = False
+            for r in range(npv):
+                # S = sum_f coef * x_f ranges over [s_lo, s_hi] on the box
+                s_lo = sum(min(coef[r][f] * lo[f], coef[r][f] * hi[f]) for f in range(nf))
+                s_hi = sum(max(coef[r][f] * lo[f], coef[r][f] * hi[f]) for f in range(nf))
+                plo[r] = max(plo[r], ceil(rhs[r] - s_hi))
+                phi[r] = min(phi[r], floor(rhs[r] - s_lo))
+                if plo[r] > phi[r]:
+                    return False
+                for f in range(nf):
+                    c = coef[r][f]
+                    if c == 0:
+                        continue
+                    rest_lo = s_lo - min(c * lo[f], c * hi[f])
+                    rest_hi = s_hi - max(c * lo[f], c * hi[f])
+                    # rhs - phi - rest_hi <= c * x_f <= rhs - plo - rest_lo
+                    a, b = (rhs[r] - phi[r] - rest_hi) / c, (rhs[r] - plo[r] - rest_lo) / c
+                    if c < 0:
+                        a, b = b, a
+                    new_lo, new_hi = max(lo[f], ceil(a)), min(hi[f], floor(b))
+                    if new_lo > new_hi:
+                        return False
+                    if new_lo != lo[f] or new_hi != hi[f]:
+                        s_lo += min(c * new_lo, c * new_hi) - min(c * lo[f], c * hi[f])
+                        s_hi += max(c * new_lo, c * new_hi) - max(c * lo[f], c * hi[f])
+                        lo[f], hi[f] = new_lo, new_hi
+                        changed = True
+            if not changed:
                 break
-            x[c] = iv
-        if not valid:
+        return True
+
+    def relax(lo, hi, plo, phi):
+        """Exact LP minimum of sum(x) over the box, with its free-variable point."""
+        # z_f = x_f - lo_f >= 0; rows: pivot >= plo, pivot <= phi, z_f <= hi_f - lo_f
+        G, h = [], []
+        for r in range(npv):
+            val = rhs[r] - sum(coef[r][f] * lo[f] for f in range(nf))
+            G.append(list(coef[r]))
+            h.append(val - plo[r])
+            G.append([-v for v in coef[r]])
+            h.append(phi[r] - val)
+        for f in range(nf):
+            G.append([Fraction(int(g == f)) for g in range(nf)])
+            h.append(Fraction(hi[f] - lo[f]))
+        res = lp_max([-w for w in weight], G, h)
+        if res is None:
+            return None
+        value, z = res
+        const = base + sum(weight[f] * lo[f] for f in range(nf))
+        return const - value, [lo[f] + z[f] for f in range(nf)]
+
+    if nf == 0:
+        total = evaluate([])
+        return total if total is not None else 10**12
+
+    # a node is a box on the free variables plus a range for every pivot
+    # the batch evaluator works in int64; only use it when no product can overflow
+    batch_safe = all(
+        abs(num[r]) + sum(abs(a[r][f]) * bounds[free_cols[f]] for f in range(nf)) < 2**62
+        for r in range(npv))
+
+    best_sum = None
+    stack = [([0] * nf, [bounds[f] for f in free_cols], [0] * npv, list(piv_ub))]
+    while stack:
+        lo, hi, plo, phi = stack.pop()
+        if not tighten(lo, hi, plo, phi):
+            continue
+        res = relax(lo, hi, plo, phi)
+        if res is None:
+            continue
+        lp_value, point = res
+        if best_sum is not None and ceil(lp_value) >= best_sum:
             continue
 
-        # final verification: A_int * x == b_int
-        ok = True
-        for j in range(mA):
-            ssum = 0
-            for k in range(n):
-                ssum += A_int[j][k] * x[k]
-            if ssum != b_int[j]:
-                ok = False
-                break
-        if not ok:
+        # small boxes are cheaper to enumerate outright than to keep splitting
+        volume = 1
+        for f in range(nf):
+            volume *= hi[f] - lo[f] + 1
+        if volume <= BATCH_BOX and batch_safe:
+            total = batch_min_sum(den, num, a, lo, hi, plo, phi)
+            if total is not None and (best_sum is None or total < best_sum):
+                best_sum = total
             continue
 
-        ssum = sum(x)
-        if best_sum is None or ssum < best_sum:
-            best_sum = ssum
+        # cheap incumbent: the rounded LP point
+        guess = [min(hi[f], max(lo[f], round(point[f]))) for f in range(nf)]
+        total = evaluate(guess)
+        if total is not None and (best_sum is None or total < best_sum):
+            best_sum = total
+            if ceil(lp_value) >= best_sum:
+                continue
+
+        # split on a fractional free variable, else on a fractional pivot;
+        # if neither exists the LP point is integral and optimal for this node
+        split = next((f for f in range(nf) if point[f].denominator != 1), None)
+        if split is not None:
+            cut = floor(point[split])
+            left = (list(lo), list(hi), list(plo), list(phi))
+            right = (list(lo), list(hi), list(plo), list(phi))
+            left[1][split] = cut
+            right[0][split] = cut + 1
+        else:
+            pv = [rhs[r] - sum(coef[r][f] * point[f] for f in range(nf)) for r in range(npv)]
+            split = next((r for r in range(npv) if pv[r].denominator != 1), None)
+            if split is None:
+                best_sum = int(lp_value)
+                continue
+            cut = floor(pv[split])
+            left = (list(lo), list(hi), list(plo), list(phi))
+            right = (list(lo), list(hi), list(plo), list(phi))
+            left[3][split] = cut
+            right[2][split] = cut + 1
+        stack.append(right)
+        stack.append(left)
 
     return best_sum if best_sum is not None else 10**12
 
@@ -285,8 +456,7 @@ def solve_joltage_for_line(buttons: List[List[int]], targets: List[int]) -> int:
         if b_int[j] > 0 and all(A_int[j][k] == 0 for k in range(n)):
             return 10**12
 
-    # call solver with a reasonable cap
-    return solve_integer_min_sum(A_int, b_int, max_free_product_cap=5_000_000)
+    return solve_integer_min_sum(A_int, b_int)
 
 # --- script entrypoint ---
 def main(filename: str):
@@ -300,11 +470,7 @@ def main(filename: str):
             continue
         diagram, buttons, targets = parsed
         machine_idx += 1
-        try:
-            mpress = solve_joltage_for_line(buttons, targets)
-        except RuntimeError as e:
-            print(f"Machine {machine_idx}: free-variable search too large; {e}")
-            raise
+        mpress = solve_joltage_for_line(buttons, targets)
         print(f"Machine {machine_idx}: min presses = {mpress}")
         total += mpress
     print("Total presses (sum over machines):", total)
@@ -1,35 +1,200 @@
-invalid_sum = 0
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 
-with open("input.txt", "r") as file:
-    for line in file:
-        line = line.strip()
-        if not line:
+
+def repeated_ids(lower, upper):
+    """Yield, in ascending order, every num in [lower, upper] whose digits are
+    one block repeated at least twice.
+
+    A length-n number made of n // i copies of an i-digit block equals
+    block * (10**n - 1) // (10**i - 1), so for each chunk size we only walk the
+    blocks whose multiple lands inside the span instead of every integer.
+    """
+    lower = max(lower, 1)
+    for n in range(len(str(lower)), len(str(upper)) + 1):
+        lo = max(lower, 10 ** (n - 1))
+        hi = min(upper, 10 ** n - 1)
+        if lo > hi:
             continue
-        for span in line.split(","):
-            span = span.strip()
-            if not span:
+        found = set()                            # count each number once
+        for i in range(1, n):                    # chunk size
+            if n % i != 0:
                 continue
-            lower_s, upper_s = span.split("-")
-            lower = int(lower_s)
-            upper = int(upper_s)
-
-            for num in range(lower, upper + 1):
-                s = str(num)
-                n = len(s)
-                found = False
-                for i in range(1, n):          # chunk size
-                    if n % i != 0:
-                        continue
-                    repetitions = n // i
-                    if repetitions < 2:
-                        continue
-                    if s == s[:i] * repetitions:
-                        invalid_sum += num
-                        found = True
-                        break                    # <--- important: count each number once
-                # end inner for i
-            # end for num
-        # end for span
-    # end for line
-
-print(invalid_sum)
+            mult = (10 ** n - 1) // (10 ** i - 1)
+            first = max(10 ** (i - 1), -(-lo // mult))
+            last = min(10 ** i - 1, hi // mult)
+            for block in range(first, last + 1):
+                found.add(block * mult)
+        yield from sorted(found)
+
+
+def span_invalid_sum(lower, upper):
+    return sum(repeated_ids(lower, upper))
+
+
+def parse_spans(line):
+    spans = []
+    for span in line.split(","):
+        span = span.strip()
+        if not span:
+            continue
+        lower_s, upper_s = span.split("-")
+        spans.append((int(lower_s), int(upper_s)))
+    return spans
+
+
+
+def merge_spans(spans):
+    """Sort spans and join overlapping or touching ones so no ID is summed twice."""
+    merged = []
+    for a, b in sorted(spans):
+        if merged and a <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return [(a, b) for a, b in merged]
+
+
+INDEX_PATH = "day2_index.pkl"
+INDEX_DIGITS = 10
+
+
+def build_index(max_digits):
+    """Return (ids, prefix) for every repeated-pattern ID with at most max_digits
+    digits; prefix[k] is the sum of ids[:k]."""
+    ids = list(repeated_ids(1, 10 ** max_digits - 1))
+    prefix = [0] + list(accumulate(ids))
+    return ids, prefix
+
+
+def load_index(max_digits, path=INDEX_PATH):
+    """Load the on-disk index if it covers max_digits, otherwise rebuild and save it."""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            digits, ids = pickle.load(f)
+        if digits >= max_digits:
+            return ids, [0] + list(accumulate(ids))
+    ids, prefix = build_index(max_digits)
+    with open(path, "wb") as f:
+        pickle.dump((max_digits, ids), f)
+    return ids, prefix
+
+
+def query_index(index, lower, upper):
+    """Sum of repeated-pattern IDs in [lower, upper] via two binary searches."""
+    ids, prefix = index
+    return prefix[bisect_right(ids, upper)] - prefix[bisect_left(ids, lower)]
+
+
+def solve(path):
+    invalid_sum = 0
+    with open(path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            for lower, upper in parse_spans(line):
+                invalid_sum += span_invalid_sum(lower, upper)
+    return invalid_sum
+
+
+def solve_indexed(path, max_digits=INDEX_DIGITS, index_path=INDEX_PATH):
+    spans = []
+    with open(path, "r") as file:
+        for line in file:
+            spans.extend(parse_spans(line.strip()))
+    spans = merge_spans(spans)
+    if not spans:
+        return 0
+    # the index only covers IDs up to max_digits digits; anything wider is
+    # counted directly so one huge span cannot blow the index up
+    cap = 10 ** max_digits - 1
+    index = load_index(max_digits, index_path)
+    total = 0
+    for lower, upper in spans:
+        if lower <= cap:
+            total += query_index(index, lower, min(upper, cap))
+        if upper > cap:
+            total += span_invalid_sum(max(lower, cap + 1), upper)
+    return total
+
+
+SHARD_WIDTH = 10 ** 9
+
+
+def shard_spans(spans, pieces, shard_width=SHARD_WIDTH):
+    """Split spans wider than shard_width into up to `pieces` contiguous
+    sub-ranges so one huge span cannot pin a single worker."""
+    shards = []
+    for lower, upper in spans:
+        width = upper - lower + 1
+        if width <= shard_width or pieces <= 1:
+            shards.append((lower, upper))
+            continue
+        step = -(-width // pieces)
+        for a in range(lower, upper + 1, step):
+            shards.append((a, min(a + step - 1, upper)))
+    return shards
+
+
+def _shard_sum(span):
+    return span_invalid_sum(*span)
+
+
+def parallel_invalid_sum(spans, workers):
+    """Sum span_invalid_sum over spans using a process pool; equal to the serial sum."""
+    shards = shard_spans(spans, workers)
+    if workers <= 1:
+        return sum(map(_shard_sum, shards))
+    chunksize = max(1, len(shards) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_shard_sum, shards, chunksize=chunksize))
+
+
+def solve_parallel(path, workers):
+    spans = []
+    with open(path, "r") as file:
+        for line in file:
+            spans.extend(parse_spans(line.strip()))
+    return parallel_invalid_sum(spans, workers)
+
+
+def benchmark(max_workers, n_spans=64, digits=12):
+    """Time parallel_invalid_sum on synthetic wide spans for 1..max_workers workers."""
+    spans = []
+    width = 10 ** digits // n_spans
+    for k in range(n_spans):
+        spans.append((k * width + 1, (k + 1) * width))
+    expected = None
+    base = None
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        total = parallel_invalid_sum(spans, workers)
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected, base = total, elapsed
+        assert total == expected, "parallel result differs from serial"
+        print(f"workers={workers}: {elapsed:.3f}s, {n_spans / elapsed:.1f} spans/s, speedup x{base / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?", default="input.txt")
+    parser.add_argument("--index", action="store_true", help="answer merged spans from the on-disk ID index")
+    parser.add_argument("--workers", type=int, default=1, help="process pool size for sharded spans")
+    parser.add_argument("--bench", action="store_true", help="benchmark 1..--workers workers on synthetic spans")
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.workers if args.workers > 1 else os.cpu_count() or 1)
+    elif args.index:
+        print(solve_indexed(args.input))
+    elif args.workers > 1:
+        print(solve_parallel(args.input, args.workers))
+    else:
+        print(solve(args.input))
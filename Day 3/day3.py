@@ -1,49 +1,103 @@
-def solve_first(lines):
-    total = 0
+import sys
+import time
 
-    for s in lines:
-        s = s.strip()
-        n = len(s)
+# int() on Python 3.11+ refuses decimal strings longer than
+# sys.get_int_max_str_digits() (4300 by default); longer ones are split
+DIGIT_CHUNK = 4000
 
-        # Precompute max digit to the right for every position
-        max_right = ["0"] * n
-        current_max = "0"
-        for i in range(n-1, -1, -1):
-            max_right[i] = current_max
-            if s[i] > current_max:
-                current_max = s[i]
 
-        best = 0
-        for i in range(n-1):  # last digit can't be the tens digit
-            tens = int(s[i])
-            units = int(max_right[i])
-            best = max(best, tens * 10 + units)
+def digits_to_int(digits):
+    """int(digits) for a str or bytes of decimal digits of any length."""
+    n = len(digits)
+    if n <= DIGIT_CHUNK:
+        return int(digits)
+    half = n // 2
+    return digits_to_int(digits[:half]) * 10 ** (n - half) + digits_to_int(digits[half:])
 
-        total += best
 
-    return total
+def best_k_digit_joltage(s, k):
+    """Largest k-digit number formed by keeping k digits of s in order.
 
-def best_12_digit_joltage(s):
+    Single pass with a monotonic stack: a digit is popped whenever a larger
+    one arrives and we can still afford to drop digits, so each digit is
+    pushed and popped at most once -> O(n) for any k.
+    """
     s = s.strip()
     n = len(s)
-    k = 12
-
-    result = []
-    start = 0
+    if n < k:
+        return 0
+
+    drop = n - k
+    stack = []
+    for ch in s:
+        while drop and stack and stack[-1] < ch:
+            stack.pop()
+            drop -= 1
+        stack.append(ch)
+
+    return digits_to_int("".join(stack[:k]))
+
+
+def best_k_digit_joltage_bytes(line, k):
+    """best_k_digit_joltage on a bytes line: digits stay as byte values in a
+    bytearray stack, so no per-character str objects are created."""
+    line = line.strip()
+    n = len(line)
+    if n < k:
+        return 0
+
+    drop = n - k
+    stack = bytearray()
+    for b in line:
+        while drop and stack and stack[-1] < b:
+            stack.pop()
+            drop -= 1
+        stack.append(b)
+
+    return digits_to_int(stack[:k])
+
+
+def joltage_profile(s):
+    """Return [best_k_digit_joltage(s, k) for k in 1..len(s)] from one stack pass.
+
+    Running the stack with an unlimited drop budget removes digits in exactly
+    the order the greedy k -> k-1 reduction would, so the string after the
+    j-th pop (stack + unread suffix) is the optimum for k = n - j.  Once the
+    input is exhausted the stack is non-increasing and its prefixes cover the
+    remaining smaller k.
+    """
+    s = s.strip()
+    n = len(s)
+    if n == 0:
+        return []
+
+    profile = [0] * n
+    profile[n - 1] = digits_to_int(s)
+    stack = []
+    for i, ch in enumerate(s):
+        while stack and stack[-1] < ch:
+            stack.pop()
+            k = len(stack) + n - i
+            profile[k - 1] = digits_to_int("".join(stack) + s[i:])
+        stack.append(ch)
+
+    value = 0
+    for k in range(1, len(stack) + 1):
+        value = value * 10 + int(stack[k - 1])
+        profile[k - 1] = value
+    return profile
 
-    while len(result) < k:
-        need = k - len(result)
-        end = n - need
 
-        # Find the maximum digit in s[start:end+1]
-        window = s[start:end+1]
-        best_digit = max(window)
-        idx = window.index(best_digit) + start
+def best_12_digit_joltage(s):
+    return best_k_digit_joltage(s, 12)
 
-        result.append(best_digit)
-        start = idx + 1
 
-    return int("".join(result))
+def solve_first(lines):
+    total = 0
+    for s in lines:
+        if s.strip():
+            total += best_k_digit_joltage(s, 2)
+    return total
 
 
 def solve_second(lines):
@@ -54,10 +108,71 @@ def solve_second(lines):
     return total
 
 
-
-with open("input.txt","r") as file:
-    lines = file.readlines()
-
-
-print(solve_first(lines))
-print(solve_second(lines))
\ No newline at end of file
+CHUNK_SIZE = 1 << 20
+
+
+def iter_lines_bytes(path, chunk_size=CHUNK_SIZE):
+    """Yield the lines of path as bytes, reading fixed-size binary chunks so
+    only the current chunk and one partial line are held in memory."""
+    tail = b""
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            parts = (tail + chunk).split(b"\n")
+            tail = parts.pop()
+            yield from parts
+    if tail:
+        yield tail
+
+
+def solve_stream(path, ks=(2, 12)):
+    """Sum best_k_digit_joltage_bytes over every bank for each k in ks.
+
+    Returns (totals, banks, seconds).
+    """
+    totals = [0] * len(ks)
+    banks = 0
+    start = time.perf_counter()
+    for line in iter_lines_bytes(path):
+        if not line.strip():
+            continue
+        banks += 1
+        for i, k in enumerate(ks):
+            totals[i] += best_k_digit_joltage_bytes(line, k)
+    return totals, banks, time.perf_counter() - start
+
+
+def solve_profile(lines):
+    """Per-k totals across all banks; banks shorter than k contribute 0."""
+    totals = []
+    for s in lines:
+        profile = joltage_profile(s)
+        if len(profile) > len(totals):
+            totals.extend([0] * (len(profile) - len(totals)))
+        for k, best in enumerate(profile):
+            totals[k] += best
+    return totals
+
+
+if __name__ == "__main__":
+    # totals for long banks have more digits than str() allows by default
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+
+    if "--profile" in sys.argv[1:]:
+        with open("input.txt","r") as file:
+            for k, total in enumerate(solve_profile(file), start=1):
+                print(f"k={k}: {total}")
+    elif "--stream" in sys.argv[1:]:
+        totals, banks, elapsed = solve_stream("input.txt")
+        for total in totals:
+            print(total)
+        print(f"{banks} banks in {elapsed:.3f}s ({banks / max(elapsed, 1e-9):.0f} lines/s)", file=sys.stderr)
+    else:
+        with open("input.txt","r") as file:
+            lines = file.readlines()
+
+        print(solve_first(lines))
+        print(solve_second(lines))
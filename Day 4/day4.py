@@ -1,66 +1,280 @@
-from collections import deque
+import pickle
+import sys
+from array import array
+
+import numpy as np
+
+# RollIndex re-peels the whole grid instead once a growth region holds more
+# than this fraction of the cells
+REPEEL_FRACTION = 1 / 16
+
+
+def load_grid(lines):
+    """Parse the map into an R x C boolean array (True where there is a roll)."""
+    rows = [line.strip() for line in lines if line.strip()]
+    raw = np.frombuffer("".join(rows).encode(), dtype=np.uint8)
+    return (raw == ord("@")).reshape(len(rows), len(rows[0]))
+
+
+def neighbor_counts(grid):
+    """Number of '@' among the 8 neighbours of every cell, as uint8.
+
+    Equivalent to a 3x3 all-ones convolution minus the centre: the grid is
+    padded by one cell and the 8 shifted views are summed.
+    """
+    R, C = grid.shape
+    padded = np.zeros((R + 2, C + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = grid
+    counts = np.zeros((R, C), dtype=np.uint8)
+    for dr, dc in DIRS:
+        counts += padded[1 + dr:1 + dr + R, 1 + dc:1 + dc + C]
+    return counts
+
+
 def solve_first(inpt):
     # Part 1 from before — count accessible rolls
-    grid = [list(line.strip()) for line in inpt]
-    R, C = len(grid), len(grid[0])
-    count_accessible = 0
-
-    for r in range(R):
-        for c in range(C):
-            if grid[r][c] != '@':
-                continue
-            adj = 0
-            for dr, dc in DIRS:
-                nr, nc = r+dr, c+dc
-                if 0 <= nr < R and 0 <= nc < C:
-                    if grid[nr][nc] == '@':
-                        adj += 1
-            if adj < 4:
-                count_accessible += 1
-
-    return count_accessible
+    grid = load_grid(inpt)
+    return int(np.count_nonzero(grid & (neighbor_counts(grid) < 4)))
 
 
 DIRS = [(-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1)]
 
-def solve_second(lines):
-    g = [list(r.strip()) for r in lines]
-    R, C = len(g), len(g[0])
+def padded_state(grid):
+    """Flat storage for the peeling engines.
 
-    # adjacency count
-    adj = [[sum(0 <= r+dr < R and 0 <= c+dc < C and g[r+dr][c+dc] == "@"
-                for dr,dc in DIRS)
-            for c in range(C)] for r in range(R)]
+    The grid is padded by a one-cell border of empty cells, so a cell is a
+    single index i = (r + 1) * W + (c + 1) and its neighbours are i + off for
+    the 8 returned offsets with no bounds checks.  Returns
+    (W, alive, adj, offsets) with alive/adj as bytearrays.
+    """
+    R, C = grid.shape
+    W = C + 2
+    rolls = np.zeros((R + 2, W), dtype=np.uint8)
+    rolls[1:-1, 1:-1] = grid
+    counts = neighbor_counts(rolls)
+    offsets = [dr * W + dc for dr, dc in DIRS]
+    return W, bytearray(rolls.tobytes()), bytearray(counts.tobytes()), offsets
 
-    q = deque((r,c) for r in range(R) for c in range(C)
-              if g[r][c]=="@" and adj[r][c] < 4)
 
-    removed = 0
-    inq = set(q)
+def peel_flat(alive, adj, offsets):
+    """Remove accessible rolls from alive in place until none are left and
+    return how many were removed.  adj ends up holding, for every survivor,
+    its number of surviving neighbours."""
+    start = (np.frombuffer(alive, dtype=np.uint8) & (np.frombuffer(adj, dtype=np.uint8) < 4))
+    q = array("i", np.flatnonzero(start).tolist())
+    inq = bytearray(len(alive))
+    for i in q:
+        inq[i] = 1
 
-    while q:
-        r,c = q.popleft()
-        if g[r][c] != "@": continue
-        g[r][c] = "."
+    removed = 0
+    head = 0
+    while head < len(q):
+        i = q[head]
+        head += 1
+        if not alive[i]: continue
+        alive[i] = 0
         removed += 1
 
-        for dr,dc in DIRS:
-            nr,nc = r+dr, c+dc
-            if 0<=nr<R and 0<=nc<C and g[nr][nc]=="@":
-                adj[nr][nc] -= 1
-                if adj[nr][nc] < 4 and (nr,nc) not in inq:
-                    q.append((nr,nc))
-                    inq.add((nr,nc))
+        for off in offsets:
+            j = i + off
+            if alive[j]:
+                adj[j] -= 1
+                if adj[j] < 4 and not inq[j]:
+                    q.append(j)
+                    inq[j] = 1
 
     return removed
 
 
+def peel(grid):
+    """Remove accessible rolls until none are left; return how many were removed."""
+    _, alive, adj, offsets = padded_state(grid)
+    return peel_flat(alive, adj, offsets)
+
+
+def peel_waves(grid):
+    """Peel in synchronous waves: every accessible roll is removed at once,
+    then neighbour counts drop by the removed rolls next to them.
+
+    Returns the number of rolls removed by each wave; the sum equals peel().
+    """
+    alive = grid.copy()
+    counts = neighbor_counts(grid)
+    waves = []
+    while True:
+        frontier = alive & (counts < 4)
+        n = int(np.count_nonzero(frontier))
+        if n == 0:
+            break
+        waves.append(n)
+        alive &= ~frontier
+        counts -= neighbor_counts(frontier)
+    return waves
+
+
+class RollIndex:
+    """Persistent Day 4 grid that stays up to date as single cells are toggled.
+
+    Besides the padded roll map and neighbour counts it keeps the set of rolls
+    that survive the full part-2 peel (the "core") together with, for every
+    core cell, its number of core neighbours.  toggle() updates the part-1
+    total in O(1) and queues the cell; removed() then only repairs the core
+    around queued cells:
+
+    * deleting a core roll can only shrink the core, so it cascades outwards
+      from that cell through core neighbours that drop below 4;
+    * adding a roll can only grow the core, and every newly surviving roll is
+      connected to a surviving added cell through other new survivors, all of
+      which have at least 4 neighbours that are core rolls or have 4 live
+      neighbours themselves; only that region is re-peeled,
+      and a region past REPEEL_FRACTION of the grid falls back to peel_flat.
+    """
+
+    def __init__(self, grid):
+        self.R, self.C = grid.shape
+        self.W, self.alive, self.adj, self.offsets = padded_state(grid)
+        self.rolls = int(np.count_nonzero(grid))
+        self.accessible = int(np.count_nonzero(grid & (neighbor_counts(grid) < 4)))
+        self._repeel()
+        self.pending = []
+
+    def _repeel(self):
+        self.core = bytearray(self.alive)
+        self.core_adj = bytearray(self.adj)
+        self.core_size = self.rolls - peel_flat(self.core, self.core_adj, self.offsets)
+
+    @classmethod
+    def from_lines(cls, lines):
+        return cls(load_grid(lines))
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _is_accessible(self, i):
+        return 1 if self.alive[i] and self.adj[i] < 4 else 0
+
+    def toggle(self, r, c):
+        """Flip cell (r, c) between roll and empty; return True if it is now a roll."""
+        if not (0 <= r < self.R and 0 <= c < self.C):
+            raise IndexError(f"cell ({r}, {c}) outside {self.R}x{self.C} grid")
+        i = (r + 1) * self.W + (c + 1)
+        alive, adj = self.alive, self.adj
+        step = -1 if alive[i] else 1
+
+        self.accessible -= self._is_accessible(i)
+        alive[i] = 1 - alive[i]
+        self.accessible += self._is_accessible(i)
+        self.rolls += step
+        for off in self.offsets:
+            j = i + off
+            self.accessible -= self._is_accessible(j)
+            adj[j] += step
+            self.accessible += self._is_accessible(j)
+
+        self.pending.append(i)
+        return step == 1
+
+    def removed(self):
+        """Part-2 answer for the current grid."""
+        if self.pending:
+            pending, self.pending = self.pending, []
+            for i in pending:
+                if not self.alive[i] and self.core[i]:
+                    self._shrink_core(i)
+            self._grow_core([i for i in pending if self.alive[i] and not self.core[i]])
+        return self.rolls - self.core_size
+
+    def _shrink_core(self, i):
+        core, core_adj, offsets = self.core, self.core_adj, self.offsets
+        core[i] = 0
+        self.core_size -= 1
+        stack = [i]
+        while stack:
+            k = stack.pop()
+            for off in offsets:
+                j = k + off
+                if core[j]:
+                    core_adj[j] -= 1
+                    if core_adj[j] < 4:
+                        core[j] = 0
+                        self.core_size -= 1
+                        stack.append(j)
+
+    def _grow_core(self, seeds):
+        alive, adj, core, core_adj, offsets = self.alive, self.adj, self.core, self.core_adj, self.offsets
+        limit = len(alive) * REPEEL_FRACTION
+
+        def candidate(j):
+            # a roll can only join the core if at least 4 of its neighbours are
+            # core rolls or rolls with >= 4 live neighbours themselves
+            if not alive[j] or core[j] or adj[j] < 4:
+                return False
+            return sum(1 for off in offsets if core[j + off] or (alive[j + off] and adj[j + off] >= 4)) >= 4
+
+        # region: candidate rolls connected to a seed through candidates
+        local = {i: 0 for i in seeds if candidate(i)}
+        stack = list(local)
+        while stack:
+            k = stack.pop()
+            for off in offsets:
+                j = k + off
+                if j not in local and candidate(j):
+                    local[j] = 0
+                    stack.append(j)
+            if len(local) > limit:
+                self._repeel()
+                return
+
+        # peel the region against the fixed core
+        for k in local:
+            local[k] = sum(1 for off in offsets if core[k + off] or (k + off) in local)
+        queue = [k for k, n in local.items() if n < 4]
+        gone = set(queue)
+        while queue:
+            k = queue.pop()
+            for off in offsets:
+                j = k + off
+                if j in local and j not in gone:
+                    local[j] -= 1
+                    if local[j] < 4:
+                        gone.add(j)
+                        queue.append(j)
+
+        survivors = [k for k in local if k not in gone]
+        for k in survivors:
+            core[k] = 1
+        for k in survivors:
+            core_adj[k] = local[k]
+            for off in offsets:
+                j = k + off
+                if core[j] and j not in local:
+                    core_adj[j] += 1
+        self.core_size += len(survivors)
+
+
+def solve_second(lines):
+    return peel(load_grid(lines))
 
 
+def solve_second_waves(lines):
+    return peel_waves(load_grid(lines))
 
-with open("input.txt","r") as file:
-    lines = file.readlines()
 
+if __name__ == "__main__":
+    with open("input.txt","r") as file:
+        lines = file.readlines()
 
-print(solve_first(lines))
-print(solve_second(lines))
\ No newline at end of file
+    print(solve_first(lines))
+    if "--waves" in sys.argv[1:]:
+        waves = solve_second_waves(lines)
+        for k, n in enumerate(waves, start=1):
+            print(f"wave {k}: {n}")
+        print(sum(waves))
+    else:
+        print(solve_second(lines))
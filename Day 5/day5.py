@@ -1,8 +1,17 @@
-def solve_first(lines):
+import argparse
+import heapq
+import os
+import tempfile
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+def parse(lines):
+    """Split the input into ranges (before the blank line) and IDs (after it)."""
     ranges = []
     ids = []
 
-    # Parse input
     reading_ranges = True
     for line in lines:
         line = line.strip()
@@ -16,32 +25,15 @@ def solve_first(lines):
         else:
             ids.append(int(line))
 
-    # Count fresh IDs
-    fresh = 0
-    for x in ids:
-        for a, b in ranges:
-            if a <= x <= b:
-                fresh += 1
-                break
-
-    return fresh
+    return ranges, ids
 
 
-def solve_second(lines):
-    ranges = []
+def merge_ranges(ranges):
+    """Sort ranges by start and merge overlapping or touching ones."""
+    if not ranges:
+        return []
+    ranges = sorted(ranges)
 
-    # Parse only the ranges (stop at blank line)
-    for line in lines:
-        line = line.strip()
-        if line == "":
-            break
-        a, b = map(int, line.split("-"))
-        ranges.append((a, b))
-
-    # Sort ranges by their start
-    ranges.sort()
-
-    # Merge overlapping ranges
     merged = []
     cur_start, cur_end = ranges[0]
 
@@ -53,17 +45,318 @@ def solve_second(lines):
             cur_start, cur_end = a, b
 
     merged.append((cur_start, cur_end))
+    return merged
+
+
+def build_index(merged):
+    """Index over disjoint sorted intervals: (starts, ends) as int64 arrays."""
+    starts = np.array([a for a, _ in merged], dtype=np.int64)
+    ends = np.array([b for _, b in merged], dtype=np.int64)
+    return starts, ends
+
+
+def is_fresh(index, x):
+    starts, ends = index
+    k = bisect_right(starts, x) - 1
+    return k >= 0 and bool(x <= ends[k])
+
+
+def count_fresh(index, ids):
+    """Count how many ids fall inside the index with one searchsorted pass."""
+    starts, ends = index
+    if len(starts) == 0 or len(ids) == 0:
+        return 0
+    ids = np.asarray(ids, dtype=np.int64)
+    k = np.searchsorted(starts, ids, side="right") - 1
+    inside = (k >= 0) & (ids <= ends[np.maximum(k, 0)])
+    return int(np.count_nonzero(inside))
+
+
+BLOCK_SIZE = 512       # IntervalSet block length; blocks split at twice this
+
+
+class IntervalSet:
+    """Mutable set of IDs stored as disjoint, sorted, non-touching intervals.
+
+    Ranges are merged with the same rule as merge_ranges (a <= cur_end + 1),
+    and the number of covered IDs is kept as a running total.  Intervals
+    live in a blocked sorted list: blocks of at most 2 * BLOCK_SIZE parallel
+    start/end lists, plus each block's first start and last end.  An update
+    bisects the block index and then one block, and only edits the one or
+    two blocks it touches (blocks it swallows whole are dropped), so it costs
+    O(log n + BLOCK_SIZE) plus the intervals it removes, never a shift of
+    the whole set.
+    """
+
+    def __init__(self, ranges=()):
+        merged = merge_ranges(list(ranges))
+        self._starts = [[a for a, _ in merged[k:k + BLOCK_SIZE]] for k in range(0, len(merged), BLOCK_SIZE)]
+        self._ends = [[b for _, b in merged[k:k + BLOCK_SIZE]] for k in range(0, len(merged), BLOCK_SIZE)]
+        self._firsts = [st[0] for st in self._starts]
+        self._lasts = [en[-1] for en in self._ends]
+        self._len = len(merged)
+        self.covered = sum(b - a + 1 for a, b in merged)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for starts, ends in zip(self._starts, self._ends):
+            yield from zip(starts, ends)
+
+    def __contains__(self, x):
+        k = bisect_right(self._firsts, x) - 1
+        if k < 0:
+            return False
+        starts = self._starts[k]
+        return x <= self._ends[k][bisect_right(starts, x) - 1]
+
+    def _normal(self, blk, off):
+        # the end of a block and the start of the next are the same position
+        if off == len(self._starts[blk]) and blk + 1 < len(self._starts):
+            return blk + 1, 0
+        return blk, off
+
+    def _span(self, lo, hi):
+        """Half-open positions (block, offset) of the intervals with end >= lo
+        and start <= hi."""
+        bi = bisect_left(self._lasts, lo)
+        if bi == len(self._lasts):
+            i = (bi - 1, len(self._starts[bi - 1]))
+        else:
+            i = (bi, bisect_left(self._ends[bi], lo))
+        bj = bisect_right(self._firsts, hi) - 1
+        j = (0, 0) if bj < 0 else (bj, bisect_right(self._starts[bj], hi))
+        return self._normal(*i), self._normal(*j)
+
+    def _before(self, pos):
+        blk, off = pos
+        return (blk, off - 1) if off else (blk - 1, len(self._starts[blk - 1]) - 1)
+
+    def _replace(self, i, j, pieces):
+        """Swap the intervals in [i, j) for pieces, inserted at i."""
+        (bi, oi), (bj, oj) = i, j
+        starts, ends = self._starts, self._ends
+        if (bi, oi) >= (bj, oj):
+            bj, oj = bi, oi                 # nothing to remove
+        removed = [(bi, oi, len(starts[bi]) if bj > bi else oj)]
+        removed += [(k, 0, len(starts[k])) for k in range(bi + 1, bj)]
+        if bj > bi:
+            removed.append((bj, 0, oj))
+        for k, x, y in removed:
+            self.covered -= sum(ends[k][x:y]) - sum(starts[k][x:y]) + (y - x)
+            self._len -= y - x
+        for a, b in pieces:
+            self.covered += b - a + 1
+        self._len += len(pieces)
+
+        new_starts = [a for a, _ in pieces]
+        new_ends = [b for _, b in pieces]
+        if bj > bi:
+            touched = [(starts[bi][:oi] + new_starts, ends[bi][:oi] + new_ends),
+                       (starts[bj][oj:], ends[bj][oj:])]
+        else:
+            touched = [(starts[bi][:oi] + new_starts + starts[bi][oj:],
+                        ends[bi][:oi] + new_ends + ends[bi][oj:])]
+
+        blocks = []
+        for st, en in touched:
+            while len(st) > 2 * BLOCK_SIZE:
+                blocks.append((st[:BLOCK_SIZE], en[:BLOCK_SIZE]))
+                st, en = st[BLOCK_SIZE:], en[BLOCK_SIZE:]
+            if st:
+                blocks.append((st, en))
+        starts[bi:bj + 1] = [st for st, _ in blocks]
+        ends[bi:bj + 1] = [en for _, en in blocks]
+        self._firsts[bi:bj + 1] = [st[0] for st, _ in blocks]
+        self._lasts[bi:bj + 1] = [en[-1] for _, en in blocks]
+
+    def add(self, a, b):
+        """Mark IDs a..b fresh, joining any interval that overlaps or touches."""
+        if not self._starts:
+            self._starts, self._ends = [[a]], [[b]]
+            self._firsts, self._lasts = [a], [b]
+            self._len, self.covered = 1, b - a + 1
+            return
+        i, j = self._span(a - 1, b + 1)
+        if i < j:
+            a = min(a, self._starts[i[0]][i[1]])
+            k, off = self._before(j)
+            b = max(b, self._ends[k][off])
+        self._replace(i, j, [(a, b)])
+
+    def remove(self, a, b):
+        """Mark IDs a..b spoiled, splitting intervals that stick out either side."""
+        if not self._starts:
+            return
+        i, j = self._span(a, b)
+        if i >= j:
+            return
+        pieces = []
+        first = self._starts[i[0]][i[1]]
+        k, off = self._before(j)
+        last = self._ends[k][off]
+        if first < a:
+            pieces.append((first, a - 1))
+        if last > b:
+            pieces.append((b + 1, last))
+        self._replace(i, j, pieces)
+
+
+def solve_first(lines):
+    ranges, ids = parse(lines)
+    return count_fresh(build_index(merge_ranges(ranges)), ids)
+
+
+def solve_second(lines):
+    ranges, _ = parse(lines)
 
     # Count total covered IDs
-    total = sum(b - a + 1 for a, b in merged)
+    total = sum(b - a + 1 for a, b in merge_ranges(ranges))
     return total
 
 
 
+# --- external-memory mode -------------------------------------------------
+
+MAX_MEMORY = 256 * 1024 * 1024
+RANGE_BYTES = 128      # rough cost of one (a, b) tuple in a Python list
+ID_BYTES = 40          # rough cost of one int in a Python list
+
+
+MERGE_FAN_IN = 64       # run files open at once during a merge pass
+
+
+def _write_lines(items, path, kind):
+    """Write an already sorted stream of "range" (a, b) or "id" records."""
+    with open(path, "w") as f:
+        for item in items:
+            f.write(f"{item[0]}-{item[1]}\n" if kind == "range" else f"{item}\n")
+    return path
+
+
+def _write_run(items, tmpdir, n, kind):
+    """Sort items and write them as one run file; return its path."""
+    items.sort()
+    return _write_lines(items, os.path.join(tmpdir, f"run{n}.txt"), kind)
+
+
+def _read_run(path, kind):
+    with open(path) as f:
+        for line in f:
+            if kind == "range":
+                a, b = line.split("-")
+                yield int(a), int(b)
+            else:
+                yield int(line)
+
+
+def _sorted_runs(items, max_items, tmpdir, prefix, kind):
+    """Cut a stream into sorted run files of at most max_items each."""
+    runs = []
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= max_items:
+            runs.append(_write_run(chunk, tmpdir, f"{prefix}{len(runs)}", kind))
+            chunk = []
+    if chunk:
+        runs.append(_write_run(chunk, tmpdir, f"{prefix}{len(runs)}", kind))
+    return runs
+
+
+def _merge_runs(runs, tmpdir, prefix, kind, fan_in=MERGE_FAN_IN):
+    """Sorted stream over all runs, never holding more than fan_in files open.
+
+    While there are more runs than fan_in, groups of fan_in runs are merged
+    into new run files (and the inputs deleted), one pass at a time.
+    """
+    level = 0
+    while len(runs) > fan_in:
+        merged = []
+        for g in range(0, len(runs), fan_in):
+            group = runs[g:g + fan_in]
+            path = os.path.join(tmpdir, f"run{prefix}m{level}_{len(merged)}.txt")
+            merged.append(_write_lines(heapq.merge(*(_read_run(r, kind) for r in group)), path, kind))
+            for r in group:
+                os.remove(r)
+        runs = merged
+        level += 1
+    return heapq.merge(*(_read_run(r, kind) for r in runs))
+
+
+def _merge_sorted_ranges(ranges):
+    """merge_ranges for an already sorted stream, yielding as it goes."""
+    cur_start = cur_end = None
+    for a, b in ranges:
+        if cur_start is not None and a <= cur_end + 1:   # overlap or touching
+            cur_end = max(cur_end, b)
+        else:
+            if cur_start is not None:
+                yield cur_start, cur_end
+            cur_start, cur_end = a, b
+    if cur_start is not None:
+        yield cur_start, cur_end
+
+
+def solve_external(path, merged_path="merged.txt", max_memory=MAX_MEMORY):
+    """Both answers for inputs larger than RAM; returns (fresh, covered).
+
+    Ranges are sorted in chunks of at most max_memory into temporary run
+    files, k-way merged with heapq.merge (at most MERGE_FAN_IN files at a
+    time, in several passes if needed) while overlapping or touching
+    intervals are joined, and the merged intervals are written to
+    merged_path.  The IDs go through the same external sort and are then
+    swept against merged_path with two pointers, so neither section is ever
+    held in memory at once.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir, open(path) as file:
+        def range_lines():
+            for line in file:
+                line = line.strip()
+                if line == "":
+                    return
+                a, b = map(int, line.split("-"))
+                yield a, b
+
+        runs = _sorted_runs(range_lines(), max(1, max_memory // RANGE_BYTES), tmpdir, "r", "range")
+        covered = 0
+        with open(merged_path, "w") as out:
+            for a, b in _merge_sorted_ranges(_merge_runs(runs, tmpdir, "r", "range")):
+                out.write(f"{a}-{b}\n")
+                covered += b - a + 1
+
+        ids = (int(line) for line in file if line.strip())
+        runs = _sorted_runs(ids, max(1, max_memory // ID_BYTES), tmpdir, "i", "id")
+        fresh = 0
+        intervals = _read_run(merged_path, "range")
+        cur = next(intervals, None)
+        for x in _merge_runs(runs, tmpdir, "i", "id"):
+            while cur is not None and cur[1] < x:
+                cur = next(intervals, None)
+            if cur is None:
+                break
+            if cur[0] <= x:
+                fresh += 1
+
+    return fresh, covered
+
 
-with open("input.txt","r") as file:
-    lines = file.readlines()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?", default="input.txt")
+    parser.add_argument("--external", action="store_true", help="sort and merge through temporary run files")
+    parser.add_argument("--max-memory", type=int, default=MAX_MEMORY // (1024 * 1024), help="MiB per in-memory sort chunk")
+    parser.add_argument("--merged", default="merged.txt", help="where --external writes the merged intervals")
+    args = parser.parse_args()
 
+    if args.external:
+        fresh, covered = solve_external(args.input, args.merged, args.max_memory * 1024 * 1024)
+        print(fresh)
+        print(covered)
+    else:
+        with open(args.input,"r") as file:
+            lines = file.readlines()
 
-print(solve_first(lines))
-print(solve_second(lines))
\ No newline at end of file
+        print(solve_first(lines))
+        print(solve_second(lines))
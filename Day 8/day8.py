@@ -1,5 +1,12 @@
-def solve_first(lines):
-    # Parse points
+import heapq
+from array import array
+from collections import defaultdict
+from itertools import product
+
+import numpy as np
+
+
+def parse_points(lines):
     points = []
     for line in lines:
         s = line.strip()
@@ -7,130 +14,393 @@ def solve_first(lines):
             continue
         x, y, z = map(int, s.split(","))
         points.append((x, y, z))
-    n = len(points)
-    if n == 0:
-        return 0
+    return points
+
+
+class UnionFind:
+    """Union by size with path halving over flat array('i') storage."""
 
-    # Union-Find
-    parent = list(range(n))
-    size = [1] * n
+    def __init__(self, n):
+        self.parent = array("i", range(n))
+        self.size = array("i", [1]) * n
+        self.components = n
 
-    def find(a):
+    def find(self, a):
+        parent = self.parent
         while parent[a] != a:
             parent[a] = parent[parent[a]]
             a = parent[a]
         return a
 
-    def union(a, b):
-        ra, rb = find(a), find(b)
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
         if ra == rb:
             return False
-        if size[ra] < size[rb]:
+        if self.size[ra] < self.size[rb]:
             ra, rb = rb, ra
-        parent[rb] = ra
-        size[ra] += size[rb]
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        self.components -= 1
         return True
 
-    # compute all pairwise squared distances
-    dist_pairs = []
-    for i in range(n):
-        x1, y1, z1 = points[i]
-        for j in range(i + 1, n):
-            x2, y2, z2 = points[j]
-            dx = x1 - x2
-            dy = y1 - y2
-            dz = z1 - z2
-            d2 = dx * dx + dy * dy + dz * dz
-            dist_pairs.append((d2, i, j))
-
-    dist_pairs.sort(key=lambda x: x[0])
-
-    # take the 1000 closest pairs (or all pairs if fewer)
-    K = 1000
-    for _, i, j in dist_pairs[:K]:
-        union(i, j)
-
-    # count component sizes
-    comp = {}
-    for i in range(n):
-        r = find(i)
-        comp[r] = comp.get(r, 0) + 1
-
-    sizes = sorted(comp.values(), reverse=True)
-    prod = 1
-    for s in sizes[:3]:
-        prod *= s
-    return prod
-
-
-def solve_second(lines):
-    # Parse points
-    points = []
-    for line in lines:
-        s = line.strip()
-        if not s:
+    def top3_product(self):
+        """Product of the three largest component sizes."""
+        sizes = sorted((self.size[r] for r in range(len(self.parent)) if self.parent[r] == r),
+                       reverse=True)
+        prod = 1
+        for s in sizes[:3]:
+            prod *= s
+        return prod
+
+
+def closest_pairs(points, K):
+    """The K smallest (d2, i, j) with i < j, in the order sorting every pair would give.
+
+    Points are bucketed into a uniform grid of cell size h; every pair with
+    d2 <= h*h lies in the same or an adjacent cell, so once at least K such
+    pairs exist they contain the answer.  h starts from the density estimate
+    and doubles until that holds.  Only the grid and a bounded heap of K
+    entries are kept, never the full pair list.
+    """
+    n = len(points)
+    if n < 2 or K <= 0:
+        return []
+    K = min(K, n * (n - 1) // 2)
+
+    lo = [min(p[a] for p in points) for a in range(3)]
+    hi = [max(p[a] for p in points) for a in range(3)]
+    # no pair is farther apart than this; once h*h reaches it every pair counts
+    max_d2 = sum((hi[a] - lo[a]) ** 2 for a in range(3))
+    volume = 1
+    for a in range(3):
+        volume *= hi[a] - lo[a] + 1
+    h = max(1, int((2 * K * volume / (n * n)) ** (1 / 3)))
+
+    while True:
+        cells = defaultdict(list)
+        for idx, (x, y, z) in enumerate(points):
+            cells[(x // h, y // h, z // h)].append(idx)
+
+        limit = h * h
+        heap = []           # max-heap on (d2, i, j) via negated keys
+        found = 0
+        for (cx, cy, cz), members in cells.items():
+            for dx, dy, dz in product((-1, 0, 1), repeat=3):
+                key = (cx + dx, cy + dy, cz + dz)
+                if key < (cx, cy, cz) or key not in cells:
+                    continue
+                others = cells[key]
+                same = key == (cx, cy, cz)
+                for ai, a in enumerate(members):
+                    x1, y1, z1 = points[a]
+                    for b in (members[ai + 1:] if same else others):
+                        x2, y2, z2 = points[b]
+                        ddx = x1 - x2
+                        ddy = y1 - y2
+                        ddz = z1 - z2
+                        d2 = ddx * ddx + ddy * ddy + ddz * ddz
+                        if d2 > limit:
+                            continue
+                        found += 1
+                        i, j = (a, b) if a < b else (b, a)
+                        item = (-d2, -i, -j)
+                        if len(heap) < K:
+                            heapq.heappush(heap, item)
+                        elif item > heap[0]:
+                            heapq.heapreplace(heap, item)
+
+        if found >= K or limit >= max_d2:
+            return sorted((-d2, -i, -j) for d2, i, j in heap)
+        h *= 2
+
+
+def solve_first(lines, K=1000):
+    points = parse_points(lines)
+    n = len(points)
+    if n == 0:
+        return 0
+
+    # take the K closest pairs (or all pairs if fewer)
+    uf = UnionFind(n)
+    for _, i, j in closest_pairs(points, K):
+        uf.union(i, j)
+
+    return uf.top3_product()
+
+
+# --- minimum spanning tree ----------------------------------------------
+#
+# Adding pairs in (d2, i, j) order until one component remains is Kruskal's
+# algorithm, so the pair that finishes the job is the largest edge of the
+# minimum spanning tree under that order.  Because (d2, i, j) is a strict
+# total order the MST is unique and any MST algorithm finds the same edge.
+
+PRIM_MAX_N = 50_000     # Borůvka overtakes dense Prim around here (both ~17s at 50k points)
+LEAF_SIZE = 128
+
+
+def mst_last_edge_prim(points):
+    """Dense Prim's with one NumPy distance row per step: O(n^2) time, O(n) memory.
+
+    Vertices not yet in the tree are kept packed at the front of the arrays
+    (the chosen one is swapped with the last), so each row only covers what
+    is left.  Returns the (i, j) pair of the largest MST edge, i < j.
+    """
+    P = np.asarray(points, dtype=np.int64)
+    n = len(P)
+    X, Y, Z = P[:, 0].copy(), P[:, 1].copy(), P[:, 2].copy()
+    ids = np.arange(n, dtype=np.int64)
+    big = np.iinfo(np.int64).max
+    best_d = np.full(n, big, dtype=np.int64)
+    best_pk = np.full(n, big, dtype=np.int64)     # pair key i * n + j with i < j
+
+    def take(k, size):
+        # move slot k out of the live prefix [0, size)
+        last_slot = size - 1
+        for arr in (X, Y, Z, ids, best_d, best_pk):
+            arr[k], arr[last_slot] = arr[last_slot], arr[k]
+
+    ux, uy, uz, u = X[0], Y[0], Z[0], 0
+    take(0, n)
+    last = (-1, -1)
+    for size in range(n - 1, 0, -1):
+        dx = X[:size] - ux
+        dy = Y[:size] - uy
+        dz = Z[:size] - uz
+        d = dx * dx + dy * dy + dz * dz
+        bd, bp, live = best_d[:size], best_pk[:size], ids[:size]
+        pk = np.minimum(live, u) * n + np.maximum(live, u)
+        better = (d < bd) | ((d == bd) & (pk < bp))
+        bd[better] = d[better]
+        bp[better] = pk[better]
+
+        m = bd.min()
+        cand = np.flatnonzero(bd == m)
+        k = int(cand[np.argmin(bp[cand])]) if len(cand) > 1 else int(cand[0])
+        last = max(last, (int(m), int(bp[k])))
+        ux, uy, uz, u = X[k], Y[k], Z[k], int(ids[k])
+        take(k, size)
+
+    return divmod(last[1], n)
+
+
+def build_leaf_blocks(P, leaf_size=LEAF_SIZE):
+    """Cut points into k-d tree leaves of at most leaf_size points.
+
+    Returns (order, starts, lo, hi): the leaves are the contiguous slices
+    order[starts[b]:starts[b + 1]], with bounding boxes lo[b] and hi[b].
+    Each split is a NumPy partition at the median of the widest axis.
+    """
+    order = np.arange(len(P))
+    blocks = []
+    stack = [order]
+    while stack:
+        ids = stack.pop()
+        if len(ids) <= leaf_size:
+            blocks.append(ids)
             continue
-        x, y, z = map(int, s.split(","))
-        points.append((x, y, z))
+        pts = P[ids]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        mid = len(ids) // 2
+        part = np.argpartition(pts[:, axis], mid)
+        stack.append(ids[part[mid:]])
+        stack.append(ids[part[:mid]])
+    order = np.concatenate(blocks)
+    starts = np.cumsum([0] + [len(ids) for ids in blocks])
+    lo = np.array([P[ids].min(axis=0) for ids in blocks])
+    hi = np.array([P[ids].max(axis=0) for ids in blocks])
+    return order, starts, lo, hi
+
+
+def mst_last_edge_boruvka(points, leaf_size=LEAF_SIZE):
+    """Borůvka's algorithm over k-d tree leaf blocks: O(n) memory, no pair list.
+
+    Each round finds, for every component, its smallest edge to another
+    component.  Queries run a whole leaf at a time: candidate leaves are
+    visited in order of box distance, each as one NumPy distance block, and
+    the scan stops once the next box is farther than the worst current best
+    edge of the components in the query leaf.  Leaves lying entirely inside
+    the query leaf's component are skipped.  Returns the (i, j) pair of the
+    largest MST edge, i < j.
+    """
+    P0 = np.asarray(points, dtype=np.int64)
+    n = len(P0)
+    order, starts, lo, hi = build_leaf_blocks(P0, leaf_size)
+    P = P0[order]                  # leaf b is P[starts[b]:starts[b + 1]]
+    norms = (P * P).sum(axis=1)    # |p - q|^2 = |p|^2 + |q|^2 - 2 p.q, exact in int64
+    nb = len(starts) - 1
+    big = np.iinfo(np.int64).max
+    uf = UnionFind(n)
+
+    last = None
+    while uf.components > 1:
+        comp = np.array([uf.find(int(i)) for i in order], dtype=np.int64)
+        cmin = np.minimum.reduceat(comp, starts[:-1])
+        cmax = np.maximum.reduceat(comp, starts[:-1])
+        leaf_comp = np.where(cmin == cmax, cmin, -1)     # -1: mixed leaf
+        best_d = np.full(n, big, dtype=np.int64)         # per component root
+        best_k = np.full(n, big, dtype=np.int64)         # pair key i * n + j, i < j
+
+        for b in range(nb):
+            q = slice(starts[b], starts[b + 1])
+            Q, qn, qc, qid = P[q], norms[q], comp[q], order[q]
+            # squared distance from this leaf's box to every leaf's box
+            gap = np.maximum(0, np.maximum(lo - hi[b], lo[b] - hi))
+            box_d = (gap * gap).sum(axis=1)
+            cands = np.flatnonzero((leaf_comp == -1) | (leaf_comp != leaf_comp[b]))
+            cands = cands[np.argsort(box_d[cands], kind="stable")]
+
+            qd = np.full(len(qc), big, dtype=np.int64)
+            qk = np.full(len(qc), big, dtype=np.int64)
+            for m in cands:
+                if box_d[m] > np.minimum(best_d[qc], qd).max():
+                    break
+                r = slice(starts[m], starts[m + 1])
+                D = qn[:, None] + norms[r][None, :] - 2 * (Q @ P[r].T)
+                D[qc[:, None] == comp[r][None, :]] = big
+                rid = order[r]
+                key = np.minimum(qid[:, None], rid[None, :]) * n + np.maximum(qid[:, None], rid[None, :])
+                row_d = D.min(axis=1)
+                row_k = np.where(D == row_d[:, None], key, big).min(axis=1)
+                better = (row_d < qd) | ((row_d == qd) & (row_k < qk))
+                qd[better] = row_d[better]
+                qk[better] = row_k[better]
+
+            # fold the leaf's answers into its components, smallest edge last
+            found = qd < big
+            if found.any():
+                idx = np.flatnonzero(found)
+                idx = idx[np.lexsort((qk[idx], qd[idx]))[::-1]]
+                c = qc[idx]
+                better = (qd[idx] < best_d[c]) | ((qd[idx] == best_d[c]) & (qk[idx] < best_k[c]))
+                best_d[c[better]] = qd[idx][better]
+                best_k[c[better]] = qk[idx][better]
+
+        roots = np.flatnonzero(best_d < big)
+        for d2, pk in sorted(set(zip(best_d[roots].tolist(), best_k[roots].tolist()))):
+            i, j = divmod(pk, n)
+            if uf.union(i, j) and (last is None or (d2, pk) > last):
+                last = (d2, pk)
+
+    return divmod(last[1], n)
+
+
+def mst_last_edge(points, backend="auto"):
+    """(i, j) of the pair whose union first leaves a single component."""
+    if backend == "auto":
+        backend = "prim" if len(points) <= PRIM_MAX_N else "boruvka"
+    if backend == "prim":
+        return mst_last_edge_prim(points)
+    if backend == "boruvka":
+        return mst_last_edge_boruvka(points)
+    raise ValueError(f"unknown MST backend: {backend}")
+
+
+def solve_second(lines, backend="auto"):
+    points = parse_points(lines)
     n = len(points)
     if n <= 1:
         return 0
 
-    # Union-Find
-    parent = list(range(n))
-    size = [1] * n
+    i, j = mst_last_edge(points, backend)
+    # multiply the X (index 0) coordinates of the two boxes
+    return points[i][0] * points[j][0]
 
-    def find(a):
-        while parent[a] != a:
-            parent[a] = parent[parent[a]]
-            a = parent[a]
-        return a
 
-    def union(a, b):
-        ra, rb = find(a), find(b)
-        if ra == rb:
-            return False
-        if size[ra] < size[rb]:
-            ra, rb = rb, ra
-        parent[rb] = ra
-        size[ra] += size[rb]
-        return True
+# --- single pass ----------------------------------------------------------
+
+EDGE_CHUNK = 32
+STREAM_EDGES_PER_POINT = 64   # solve() falls back to mst_last_edge past this
+
+
+def edge_stream(P, chunk=EDGE_CHUNK):
+    """Yield every (d2, i, j) with i < j in sorted order without building the list.
+
+    A heap holds the next edge of each row i.  Each row keeps only a chunk of
+    its nearest partners j > i, picked by a NumPy partial sort; when the chunk
+    runs out the row is refilled with the next partners after the last one
+    handed out.  A row's chunk doubles on every refill, so draining a whole
+    row costs O(log n) distance passes instead of O(n / chunk).
+    """
+    n = len(P)
+    X, Y, Z = P[:, 0], P[:, 1], P[:, 2]
+    rows = [None] * n          # per row: list of (d2, j) still to hand out, reversed
+    sizes = [chunk] * n        # per row: size of its next refill
+
+    def refill(i, after):
+        chunk = sizes[i]
+        sizes[i] = 2 * chunk
+        js = np.arange(i + 1, n)
+        d = (X[i + 1:] - X[i]) ** 2 + (Y[i + 1:] - Y[i]) ** 2 + (Z[i + 1:] - Z[i]) ** 2
+        if after is not None:
+            ld, lj = after
+            keep = (d > ld) | ((d == ld) & (js > lj))
+            js, d = js[keep], d[keep]
+        if len(d) > chunk:
+            cut = np.partition(d, chunk - 1)[chunk - 1]
+            keep = d <= cut
+            js, d = js[keep], d[keep]
+        order = np.lexsort((js, d))[:chunk]
+        rows[i] = list(zip(d[order].tolist(), js[order].tolist()))[::-1]
+
+    heap = []
+    for i in range(n - 1):
+        refill(i, None)
+        d2, j = rows[i].pop()
+        heap.append((d2, i, j))
+    heapq.heapify(heap)
+
+    while heap:
+        d2, i, j = heap[0]
+        yield d2, i, j
+        if not rows[i]:
+            refill(i, (d2, j))
+        if rows[i]:
+            nd, nj = rows[i].pop()
+            heapq.heapreplace(heap, (nd, i, nj))
+        else:
+            heapq.heappop(heap)
+
+
+def solve(lines, K=1000):
+    """Both answers from one parse, one sorted edge stream and one union-find.
+
+    The part-1 snapshot is taken after the K-th edge and the stream keeps
+    going to the part-2 join.  Scattered points join within a few edges per
+    point; only if the stream passes STREAM_EDGES_PER_POINT * n edges (a far
+    outlier makes it hand out nearly all n^2 pairs) is part 2 handed to
+    mst_last_edge instead.
+    """
+    points = parse_points(lines)
+    P = np.array(points, dtype=np.int64).reshape(-1, 3)
+    n = len(P)
+    if n == 0:
+        return 0, 0
 
-    # compute all pairwise squared distances
-    dist_pairs = []
-    for i in range(n):
-        x1, y1, z1 = points[i]
-        for j in range(i + 1, n):
-            x2, y2, z2 = points[j]
-            dx = x1 - x2
-            dy = y1 - y2
-            dz = z1 - z2
-            d2 = dx * dx + dy * dy + dz * dz
-            dist_pairs.append((d2, i, j))
-
-    dist_pairs.sort(key=lambda x: x[0])
-
-    # initial component count
-    components = n
-
-    # iterate pairs in increasing distance; the moment union reduces components to 1,
-    # return the product of X coordinates of that pair.
-    for _, i, j in dist_pairs:
-        if find(i) != find(j):
-            unioned = union(i, j)
-            if unioned:
-                components -= 1
-                if components == 1:
-                    # multiply the X (index 0) coordinates of the two boxes
-                    return points[i][0] * points[j][0]
-
-    # If we never reached one component (shouldn't happen for reasonable inputs), return 0
-    return 0
+    uf = UnionFind(n)
+    first = second = None
+    if n == 1:
+        second = 0
+    budget = max(K, STREAM_EDGES_PER_POINT * n)
+    for count, (_, i, j) in enumerate(edge_stream(P), start=1):
+        if uf.union(i, j) and uf.components == 1:
+            # multiply the X (index 0) coordinates of the two boxes
+            second = int(P[i, 0]) * int(P[j, 0])
+        if count == K:
+            first = uf.top3_product()
+        if first is not None and (second is not None or count >= budget):
+            break
+    if first is None:
+        first = uf.top3_product()
+    if second is None:
+        i, j = mst_last_edge(points)
+        second = points[i][0] * points[j][0]
+    return first, second
 
 
 if __name__ == "__main__":
     with open("input.txt", "r") as file:
         lines = file.readlines()
 
-    print(solve_first(lines))
-    print(solve_second(lines))
+    for answer in solve(lines):
+        print(answer)
@@ -1,3 +1,66 @@
+import argparse
+import heapq
+import multiprocessing as mp
+import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+
+import numpy as np
+
+
+def lower_left_frontier(pts):
+    """Points with no other point weakly below-left of them, x ascending / y descending."""
+    out = []
+    for x, y in sorted(pts):
+        if not out or y < out[-1][1]:
+            out.append((x, y))
+    return out
+
+
+def upper_right_frontier(pts):
+    """Points with no other point weakly above-right of them, x ascending / y descending."""
+    out = []
+    for x, y in sorted(pts, reverse=True):
+        if not out or y > out[-1][1]:
+            out.append((x, y))
+    return out[::-1]
+
+
+def best_dominating_area(lows, highs):
+    """max (qx - px + 1) * (qy - py + 1) over p in lows, q in highs with q above-right of p.
+
+    Both staircases run x ascending / y descending, which makes the best
+    partner index monotone in p, so a divide-and-conquer sweep finds every
+    row maximum in O((|lows| + |highs|) log |lows|).
+    """
+    best = 0
+
+    def value(p, q):
+        dx = q[0] + 1 - p[0]
+        dy = q[1] + 1 - p[1]
+        if dx <= 0 and dy <= 0:
+            return None
+        return dx * dy
+
+    stack = [(0, len(lows) - 1, 0, len(highs) - 1)]
+    while stack:
+        lo, hi, opt_lo, opt_hi = stack.pop()
+        if lo > hi:
+            continue
+        mid = (lo + hi) // 2
+        p = lows[mid]
+        arg, top = opt_lo, None
+        for j in range(opt_lo, opt_hi + 1):
+            v = value(p, highs[j])
+            if v is not None and (top is None or v > top):
+                arg, top = j, v
+        if top is not None and top > best:
+            best = top
+        stack.append((lo, mid - 1, opt_lo, arg))
+        stack.append((mid + 1, hi, arg, opt_hi))
+    return best
+
+
 def solve_first(lines):
     pts = []
     for line in lines:
@@ -6,34 +69,24 @@ def solve_first(lines):
             x, y = map(int, s.split(","))
             pts.append((x, y))
 
-    n = len(pts)
-    best = 0
-    for i in range(n):
-        x1, y1 = pts[i]
-        for j in range(i + 1, n):
-            x2, y2 = pts[j]
-            area = (abs(x1 - x2) + 1) * (abs(y1 - y2) + 1)
-            best = max(best, area)
-    return best
+    if len(pts) < 2:
+        return 0
 
+    # The best rectangle has its corners on opposite staircases: lower-left
+    # with upper-right, or (after flipping y) upper-left with lower-right.
+    flipped = [(x, -y) for x, y in pts]
+    return max(best_dominating_area(lower_left_frontier(pts), upper_right_frontier(pts)),
+               best_dominating_area(lower_left_frontier(flipped), upper_right_frontier(flipped)))
 
 
-def solve_second(lines):
-    # Parse polygon vertices
-    poly = []
-    for line in lines:
-        s = line.strip()
-        if s:
-            x, y = map(int, s.split(","))
-            poly.append((x, y))
-
-    n = len(poly)
 
-    # Pre-process edges for faster checking
-    # Store as (coordinate, start, end)
+def poly_edges(poly):
+    """Split the polygon outline into horizontal (y, xmin, xmax) and
+    vertical (x, ymin, ymax) edges."""
     edges_h = [] # Horizontal edges: y, xmin, xmax
     edges_v = [] # Vertical edges:   x, ymin, ymax
-    
+
+    n = len(poly)
     for i in range(n):
         x1, y1 = poly[i]
         x2, y2 = poly[(i + 1) % n]
@@ -41,78 +94,349 @@ def solve_second(lines):
             edges_h.append((y1, min(x1, x2), max(x1, x2)))
         else:
             edges_v.append((x1, min(y1, y2), max(y1, y2)))
+    return edges_h, edges_v
+
+
+def build_inside_grid(poly):
+    """Coordinate-compressed inside/outside map with a 2D prefix sum.
+
+    Sorted distinct vertex xs become columns 0, 2, 4, ... and the open gaps
+    between them the odd columns; the same for ys.  Every compressed cell is
+    then uniformly boundary, inside or outside.  Odd (gap) rows get their
+    inside cells from the parity of vertical edges crossed to their left;
+    a non-boundary cell on a vertex row matches the gap row next to it.
+    Gaps between coordinates that differ by 1 contain no tiles and never
+    count as outside.
+
+    Returns (xi, yi, prefix) where prefix[r][c] counts outside cells in
+    rows < r and columns < c.
+    """
+    edges_h, edges_v = poly_edges(poly)
+    xs = sorted({x for x, _ in poly})
+    ys = sorted({y for _, y in poly})
+    xi = {x: 2 * k for k, x in enumerate(xs)}
+    yi = {y: 2 * k for k, y in enumerate(ys)}
+    H, W = 2 * len(ys) - 1, 2 * len(xs) - 1
+
+    boundary = np.zeros((H, W), dtype=bool)
+    cross = np.zeros((H, W), dtype=np.int32)
+    for y, xa, xb in edges_h:
+        boundary[yi[y], xi[xa]:xi[xb] + 1] = True
+    for x, ya, yb in edges_v:
+        boundary[yi[ya]:yi[yb] + 1, xi[x]] = True
+        cross[yi[ya] + 1:yi[yb]:2, xi[x]] = 1
+
+    inside = (np.cumsum(cross, axis=1) & 1).astype(bool)
+    if H > 1:
+        inside[0:H - 1:2] = inside[1::2]
+        inside[H - 1] = inside[H - 2]
+
+    outside = ~(boundary | inside)
+    outside[:, [2 * k + 1 for k in range(len(xs) - 1) if xs[k + 1] - xs[k] == 1]] = False
+    outside[[2 * k + 1 for k in range(len(ys) - 1) if ys[k + 1] - ys[k] == 1], :] = False
+
+    prefix = np.zeros((H + 1, W + 1), dtype=np.int64)
+    prefix[1:, 1:] = outside.cumsum(axis=0).cumsum(axis=1)
+    return xi, yi, prefix
+
+
+def rect_inside(grid, xmin, xmax, ymin, ymax):
+    """O(1): does the rectangle between these vertex coordinates hold only
+    red/green tiles?"""
+    xi, yi, prefix = grid
+    r1, r2 = yi[ymin], yi[ymax] + 1
+    c1, c2 = xi[xmin], xi[xmax] + 1
+    return prefix[r2, c2] - prefix[r1, c2] - prefix[r2, c1] + prefix[r1, c1] == 0
+
+
+class EdgeIndex:
+    """Exact integer point-in-polygon and segment tests for a rectilinear polygon.
+
+    The y axis is cut into slabs between consecutive vertex ys and a segment
+    tree is built over the slabs: each vertical edge is stored in the
+    O(log n) tree nodes that exactly cover the slabs it spans, and every node
+    keeps its xs sorted.  A ray cast to +x from (px, py) uses the half-open
+    rule ymin <= py < ymax, i.e. the edges spanning the slab containing py,
+    which are those stored on the root-to-leaf path of that slab; the
+    crossing count is one bisect per node on the path.  Horizontal and
+    vertical edges are also kept per line for the on-boundary test.  No
+    floats are involved anywhere.
+    """
+
+    def __init__(self, poly):
+        self.poly = poly
+        edges_h, edges_v = poly_edges(poly)
+        self.ys = sorted({y for _, y in poly})
+        slab_of = {y: k for k, y in enumerate(self.ys)}
+        size = 1
+        while size < len(self.ys):
+            size *= 2
+        self.size = size
+        tree = defaultdict(list)   # node -> xs of the edges covering it
+        for x, ya, yb in edges_v:
+            lo, hi = slab_of[ya] + size, slab_of[yb] + size
+            while lo < hi:
+                if lo & 1:
+                    tree[lo].append(x)
+                    lo += 1
+                if hi & 1:
+                    hi -= 1
+                    tree[hi].append(x)
+                lo >>= 1
+                hi >>= 1
+        for xs in tree.values():
+            xs.sort()
+        self.tree = dict(tree)
+
+        self.h_by_y = defaultdict(list)
+        for y, xa, xb in edges_h:
+            self.h_by_y[y].append((xa, xb))
+        self.v_by_x = defaultdict(list)
+        for x, ya, yb in edges_v:
+            self.v_by_x[x].append((ya, yb))
+        for spans in (*self.h_by_y.values(), *self.v_by_x.values()):
+            spans.sort()
+        self.v_xs = sorted(self.v_by_x)
+        self._transposed = None
+
+    @staticmethod
+    def _on_span(spans, v):
+        k = bisect_left(spans, (v + 1,)) - 1
+        return k >= 0 and spans[k][1] >= v
+
+    def on_boundary(self, px, py):
+        return (self._on_span(self.h_by_y.get(py, ()), px)
+                or self._on_span(self.v_by_x.get(px, ()), py))
 
-    def is_valid_rect(xmin, xmax, ymin, ymax):
-        # 1. Center Check (Point in Polygon)
-        # We verify the geometric center is inside. 
-        cx = (xmin + xmax) / 2
-        cy = (ymin + ymax) / 2
-        
-        inside = False
-        # Add epsilon to cy to avoid issues if center lies exactly on a horizontal integer line
-        test_y = cy + 1e-9 
-        
-        for i in range(n):
-            px1, py1 = poly[i]
-            px2, py2 = poly[(i + 1) % n]
-            
-            # Standard Ray Casting
-            if (py1 > test_y) != (py2 > test_y):
-                x_int = px1 + (test_y - py1) * (px2 - px1) / (py2 - py1)
-                if x_int > cx:
-                    inside = not inside
-        
-        if not inside:
-            return False
-
-        # 2. Vertex Inside Check
-        # If the polygon winds inside the rectangle, a vertex must be strictly inside
-        for px, py in poly:
-            if xmin < px < xmax and ymin < py < ymax:
-                return False
-
-        # 3. Edge Splitting Check
-        # A polygon edge cannot cut the rectangle in half
-        
-        # Check horizontal edges splitting the rectangle
-        for ey, ex1, ex2 in edges_h:
-            # Splits if the edge Y is strictly between top/bottom
-            # AND the edge spans the entire width of the rectangle
-            if ymin < ey < ymax and ex1 <= xmin and ex2 >= xmax:
-                return False
-
-        # Check vertical edges splitting the rectangle
-        for ex, ey1, ey2 in edges_v:
-            # Splits if the edge X is strictly between left/right
-            # AND the edge spans the entire height of the rectangle
-            if xmin < ex < xmax and ey1 <= ymin and ey2 >= ymax:
-                return False
-
-        return True
+    def _path(self, py):
+        """Sorted xs lists on the root-to-leaf path of the slab holding py."""
+        k = bisect_right(self.ys, py) - 1
+        if k < 0 or k >= len(self.ys):
+            return
+        node = k + self.size
+        while node:
+            xs = self.tree.get(node)
+            if xs:
+                yield xs
+            node >>= 1
 
+    def crossings(self, px, py):
+        """Vertical edges crossed by the ray from (px, py) towards +x."""
+        return sum(len(xs) - bisect_right(xs, px) for xs in self._path(py))
+
+    def contains(self, px, py):
+        """Is tile (px, py) inside the polygon or on its outline?"""
+        return self.on_boundary(px, py) or self.crossings(px, py) % 2 == 1
+
+    def contains_points(self, points):
+        return [self.contains(px, py) for px, py in points]
+
+    def _row_breaks(self, y, xa, xb):
+        # xs on row y where contains() can change value
+        breaks = set()
+        for xs in self._path(y):
+            breaks.update(xs[bisect_left(xs, xa):bisect_right(xs, xb)])
+        for x0, x1 in self.h_by_y.get(y, ()):
+            breaks.update(v for v in (x0, x1) if xa <= v <= xb)
+        breaks.update(self.v_xs[bisect_left(self.v_xs, xa):bisect_right(self.v_xs, xb)])
+        return breaks
+
+    def segment_inside(self, x1, y1, x2, y2):
+        """Are all tiles on the axis-parallel segment (x1, y1)-(x2, y2) inside?
+
+        contains() is constant between consecutive break points (edge xs
+        met along the row), so it is enough to test the ends, each break
+        point and one tile on either side of it.
+        """
+        if x1 == x2 and y1 != y2:
+            if self._transposed is None:
+                self._transposed = EdgeIndex([(y, x) for x, y in self.poly])
+            return self._transposed.segment_inside(y1, x1, y2, x2)
+        if y1 != y2:
+            raise ValueError("segment must be horizontal or vertical")
+        xa, xb = min(x1, x2), max(x1, x2)
+        probes = {xa, xb}
+        for b in self._row_breaks(y1, xa, xb):
+            probes.update(v for v in (b - 1, b, b + 1) if xa <= v <= xb)
+        return all(self.contains(x, y1) for x in probes)
+
+    def segments_inside(self, segments):
+        return [self.segment_inside(*seg) for seg in segments]
+
+
+CANDIDATE_CHUNK = 64
+
+
+def candidates_by_area(poly, chunk=CANDIDATE_CHUNK):
+    """Yield (area, i, j) for every vertex pair i < j, largest area first.
+
+    A heap holds the best remaining partner of each vertex i.  Partners j > i
+    are kept per vertex as a short chunk taken with a NumPy partial sort and
+    refilled after the last one handed out, so the full pair list is never
+    built.  A vertex's chunk doubles on every refill, so draining a whole row
+    costs O(log n) area passes instead of O(n / chunk).
+    """
+    n = len(poly)
+    X = np.array([x for x, _ in poly], dtype=np.int64)
+    Y = np.array([y for _, y in poly], dtype=np.int64)
+    rows = [None] * n          # per vertex: list of (area, j) still to hand out, reversed
+    sizes = [chunk] * n        # per vertex: size of its next refill
+
+    def refill(i, after):
+        chunk = sizes[i]
+        sizes[i] = 2 * chunk
+        js = np.arange(i + 1, n)
+        a = (np.abs(X[i + 1:] - X[i]) + 1) * (np.abs(Y[i + 1:] - Y[i]) + 1)
+        if after is not None:
+            la, lj = after
+            keep = (a < la) | ((a == la) & (js > lj))
+            js, a = js[keep], a[keep]
+        if len(a) > chunk:
+            cut = np.partition(a, len(a) - chunk)[len(a) - chunk]
+            keep = a >= cut
+            js, a = js[keep], a[keep]
+        order = np.lexsort((js, -a))[:chunk]
+        rows[i] = list(zip(a[order].tolist(), js[order].tolist()))[::-1]
+
+    heap = []
+    for i in range(n - 1):
+        refill(i, None)
+        area, j = rows[i].pop()
+        heap.append((-area, i, j))
+    heapq.heapify(heap)
+
+    while heap:
+        neg, i, j = heap[0]
+        yield -neg, i, j
+        if not rows[i]:
+            refill(i, (-neg, j))
+        if rows[i]:
+            area, nj = rows[i].pop()
+            heapq.heapreplace(heap, (-area, i, nj))
+        else:
+            heapq.heappop(heap)
+
+
+# --- parallel validation ----------------------------------------------
+
+BATCH_SIZE = 256
+
+_worker_poly = None
+_worker_grid = None
+_worker_best = None
+
+
+def _init_worker(poly, best):
+    # runs once per worker: keep the polygon and its grid for every batch
+    global _worker_poly, _worker_grid, _worker_best
+    _worker_poly = poly
+    _worker_grid = build_inside_grid(poly)
+    _worker_best = best
+
+
+def _validate_batch(batch):
+    """Validate one descending-area batch; returns (best area found, validated)."""
+    validated = 0
+    for area, i, j in batch:
+        if area <= _worker_best.value:
+            break                       # nothing left in this batch can win
+        x1, y1 = _worker_poly[i]
+        x2, y2 = _worker_poly[j]
+        validated += 1
+        if rect_inside(_worker_grid, min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2)):
+            with _worker_best.get_lock():
+                if area > _worker_best.value:
+                    _worker_best.value = area
+            return area, validated
+    return 0, validated
+
+
+def _batches(candidates, size):
+    batch = []
+    for cand in candidates:
+        batch.append(cand)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parallel_best_area(poly, workers, stats=None, batch_size=BATCH_SIZE):
+    """Same result as the serial search, validating candidate batches in a pool.
+
+    Batches are submitted in descending-area order with a bounded number in
+    flight.  The best area found so far lives in a shared Value, so workers
+    drop candidates that can no longer win, and no batch is submitted once an
+    answer exists: every later candidate is smaller.
+    """
+    best = mp.Value("q", 0)
+    generated = validated = 0
+    with mp.Pool(workers, initializer=_init_worker, initargs=(poly, best)) as pool:
+        pending = deque()
+        for batch in _batches(candidates_by_area(poly), batch_size):
+            generated += len(batch)
+            pending.append(pool.apply_async(_validate_batch, (batch,)))
+            while pending and (len(pending) >= 2 * workers or pending[0].ready()):
+                area, count = pending.popleft().get()
+                validated += count
+            if best.value:
+                break
+        for res in pending:
+            area, count = res.get()
+            validated += count
+
+    if stats is not None:
+        stats["generated"] = generated
+        stats["validated"] = validated
+    return best.value
+
+
+def solve_second(lines, stats=None, workers=1):
+    # Parse polygon vertices
+    poly = []
+    for line in lines:
+        s = line.strip()
+        if s:
+            x, y = map(int, s.split(","))
+            poly.append((x, y))
+
+    if len(poly) < 2:
+        return 0
+    if workers > 1:
+        return parallel_best_area(poly, workers, stats)
+    grid = build_inside_grid(poly)
+
+    # Candidates come largest first, so the first valid rectangle wins; every
+    # candidate pulled here is validated, so only one count is kept
+    validated = 0
     best = 0
-    # Iterate all pairs of vertices to form candidate rectangles
-    for i in range(n):
+    for area, i, j in candidates_by_area(poly):
         x1, y1 = poly[i]
-        for j in range(i + 1, n):
-            x2, y2 = poly[j]
+        x2, y2 = poly[j]
+        validated += 1
+        if rect_inside(grid, min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2)):
+            best = area
+            break
 
-            xmin, xmax = min(x1, x2), max(x1, x2)
-            ymin, ymax = min(y1, y2), max(y1, y2)
-            
-            current_area = (xmax - xmin + 1) * (ymax - ymin + 1)
-            
-            # Optimization: Don't run expensive checks if area isn't better
-            if current_area <= best:
-                continue
+    if stats is not None:
+        stats["validated"] = validated
+    return best
 
-            if is_valid_rect(xmin, xmax, ymin, ymax):
-                best = current_area
 
-    return best
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", nargs="?", default="input.txt")
+    parser.add_argument("--workers", type=int, default=1, help="validate part-2 candidates in a process pool")
+    parser.add_argument("--stats", action="store_true", help="report part-2 candidate counts on stderr")
+    args = parser.parse_args()
 
-# ----------------------- RUN ----------------------------
-with open("input.txt", "r") as f:
-    lines = f.readlines()
-print(solve_first(lines))
-print(solve_second(lines))
\ No newline at end of file
+    with open(args.input, "r") as f:
+        lines = f.readlines()
+    print(solve_first(lines))
+    stats = {}
+    print(solve_second(lines, stats, args.workers))
+    if args.stats:
+        # the serial search validates every candidate it pulls, so it only
+        # reports "validated"; the pool also counts batches it never checked
+        print(", ".join(f"candidates {key}: {count}" for key, count in stats.items()), file=sys.stderr)